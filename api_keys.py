@@ -1,5 +1,8 @@
 import os
 
+# Kubeconfig used when KUBECONFIG is not set in the environment.
+DEFAULT_KUBECONFIG = "/etc/kubernetes/admin.conf"
+
 #  Exports API keys as environment variables for use in the application.
 def export_env_vars(api_keys):
     # Retrieve API keys from the dictionary
@@ -10,7 +13,7 @@ def export_env_vars(api_keys):
     # Ensure the KUBECONFIG environment variable is set
     # This is required for Kubernetes operations
     if "KUBECONFIG" not in os.environ:
-     os.environ["KUBECONFIG"] = "/etc/kubernetes/admin.conf"
+     os.environ["KUBECONFIG"] = DEFAULT_KUBECONFIG
 
     if ngc_api_key:
         os.environ["NGC_API_KEY"] = ngc_api_key
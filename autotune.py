@@ -0,0 +1,149 @@
+import json
+import os
+import subprocess
+import time
+
+from capacity_planner import SLO_COLUMNS, capacity_settings
+from config_loader import get_user_input_path, load_config, load_toml_config, update_config_value
+from manifest_renderer import manifest_name
+from pod_manager import list_matching_profiles
+from results_parser import collect_results
+from results_store import write_run_metadata
+from runtime_manager import (apply_runtime_yaml, create_or_apply_deploy_yaml, render_deployment_manifests,
+                             wait_for_clusterservingruntime, wait_for_inference_service_ready)
+from toml_updater import update_cluster_ip_in_toml
+from utils import (copy_artifacts_from_pod_using_toml, create_download_job, delete_download_job, render_download_yaml,
+                   run_bench_script_from_pod, wait_for_download_job)
+
+# Fixed probe workload used when [autotune] does not override it.
+DEFAULT_PROBE = {
+    "use_cases": "Search",
+    "concurrency_values": "16",
+    "measurement_interval": "30000",
+}
+
+
+# Deletes the InferenceService so the next deployment starts pods with the new runtime profile.
+def delete_inference_service(namespace, isvc_name):
+    print(f" Deleting InferenceService '{isvc_name}' before switching profile...")
+    subprocess.run(["kubectl", "delete", "inferenceservice", isvc_name, "-n", namespace,
+                    "--ignore-not-found", "--wait=true"], check=True)
+
+
+# Returns how far the worst probe row exceeds its SLOs (<= 1.0 means every SLO is met).
+def slo_ratio(rows, slos):
+    worst = 0.0
+    for name, limit in slos.items():
+        if limit is None:
+            continue
+        for row in rows:
+            value = row.get(SLO_COLUMNS[name])
+            if value is None:
+                return float("inf")
+            worst = max(worst, value / limit)
+    return worst
+
+
+# Scores a profile's probe: candidates meeting every SLO rank above the rest, then by output token throughput.
+def score_probe(rows, slos):
+    throughputs = [row["output_token_throughput"] for row in rows if row.get("output_token_throughput") is not None]
+    throughput = sum(throughputs) / len(throughputs) if throughputs else 0.0
+    ratio = slo_ratio(rows, slos)
+    return {"meets_slo": ratio <= 1.0, "slo_ratio": ratio, "output_token_throughput": throughput}
+
+
+# Downloads the profile into the model cache with a fresh download job and waits for it to finish.
+# The job name is shared by all profiles, so the previous profile's job is removed first.
+def download_profile(namespace, profile_id, timeout):
+    download_yaml, image, _ = load_toml_config()
+    manifest = render_download_yaml(download_yaml, image, profile_id)
+    delete_download_job(manifest, namespace)
+    create_download_job(manifest, namespace)
+    wait_for_download_job(manifest, namespace, timeout=timeout)
+
+
+# Deploys one profile, runs the probe workload against it and returns the probe result rows.
+def probe_profile(namespace, target_pod, profile_id, probe, ready_timeout, download_timeout):
+    update_config_value("profile", "selected_model_id", profile_id)
+    runtime_manifest, deploy_manifest = render_deployment_manifests()
+    isvc_name = manifest_name(deploy_manifest)
+
+    delete_inference_service(namespace, isvc_name)
+    download_profile(namespace, profile_id, download_timeout)
+    apply_runtime_yaml(runtime_manifest, namespace)
+    wait_for_clusterservingruntime(namespace)
+    create_or_apply_deploy_yaml(deploy_manifest, namespace)
+    wait_for_inference_service_ready(namespace, isvc_name, timeout=ready_timeout)
+    update_cluster_ip_in_toml(namespace)
+
+    overrides = dict(probe, export_file_name=f"{load_config()['final_exec']['export_file_name']}-autotune-{profile_id[:12]}")
+    run_id = run_bench_script_from_pod(get_user_input_path(), target_pod, namespace, overrides=overrides)
+    copy_artifacts_from_pod_using_toml(namespace, target_pod)
+    # selected_model_id holds the probed profile at this point, so the run is indexed under it
+    config = load_config()
+    destination_path = config["paths"]["destination_path"]
+    write_run_metadata(destination_path, run_id, config)
+    return run_id, collect_results(destination_path, export_file_name=run_id)
+
+
+# Deploys every profile matching the pattern in turn, probes each one and stores the best in selected_model_id.
+def autotune_profile(namespace, target_pod):
+    config = load_config()
+    autotune_cfg = config.get("autotune", {})
+    probe = {key: str(autotune_cfg.get(key, default)) for key, default in DEFAULT_PROBE.items()}
+    ready_timeout = int(autotune_cfg.get("ready_timeout", 1800))
+    download_timeout = int(autotune_cfg.get("download_timeout", 3600))
+    slos = capacity_settings(config)["slos"]
+
+    profile_ids = list_matching_profiles(namespace)
+    if not profile_ids:
+        raise RuntimeError("No profile matching the [profile] pattern found in the profile pod logs.")
+    print(f" Auto-tuning across {len(profile_ids)} profile(s): {', '.join(profile_ids)}")
+
+    candidates = []
+    try:
+        for profile_id in profile_ids:
+            print(f"\n Probing profile {profile_id}...")
+            try:
+                run_id, rows = probe_profile(namespace, target_pod, profile_id, probe, ready_timeout,
+                                             download_timeout)
+            # ValueError covers a probe that found no service and so has no cluster_ip to benchmark
+            except (subprocess.CalledProcessError, RuntimeError, TimeoutError, ValueError) as e:
+                print(f" Profile {profile_id} failed its probe: {e}")
+                candidates.append({"profile_id": profile_id, "error": str(e)})
+                continue
+            # No result rows means genai-perf produced nothing to score, which is a failed probe rather than 0 tok/s
+            if not rows:
+                print(f" Profile {profile_id} failed its probe: no results found for run {run_id}")
+                candidates.append({"profile_id": profile_id, "run_id": run_id, "error": "probe produced no results"})
+                continue
+            result = dict(score_probe(rows, slos), profile_id=profile_id, run_id=run_id)
+            print(f" Profile {profile_id}: {result['output_token_throughput']:.1f} tok/s, "
+                  f"{'meets' if result['meets_slo'] else 'misses'} SLO (worst ratio {result['slo_ratio']:.2f})")
+            candidates.append(result)
+    finally:
+        # Remove the last probed deployment so the deploy stage starts the chosen profile from scratch
+        _, deploy_manifest = render_deployment_manifests()
+        delete_inference_service(namespace, manifest_name(deploy_manifest))
+
+    scored = [c for c in candidates if "error" not in c]
+    if not scored:
+        raise RuntimeError("Every candidate profile failed its probe.")
+    # Within SLO: highest throughput wins. Otherwise the profile closest to meeting its SLOs wins.
+    within_slo = [c for c in scored if c["meets_slo"]]
+    if within_slo:
+        best = max(within_slo, key=lambda c: c["output_token_throughput"])
+    else:
+        print(" No profile met every SLO, selecting the one closest to them.")
+        best = min(scored, key=lambda c: (c["slo_ratio"], -c["output_token_throughput"]))
+    update_config_value("profile", "selected_model_id", best["profile_id"])
+    print(f"\n Selected profile {best['profile_id']} ({best['output_token_throughput']:.1f} tok/s)")
+
+    destination_path = config["paths"]["destination_path"]
+    os.makedirs(destination_path, exist_ok=True)
+    report_path = os.path.join(destination_path, f"autotune-{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, "w") as f:
+        json.dump({"probe": probe, "slo": slos, "selected_model_id": best["profile_id"],
+                   "candidates": candidates}, f, indent=2)
+    print(f" Auto-tune report written to {report_path}")
+    return best["profile_id"]
@@ -38,6 +38,7 @@ while [[ "$#" -gt 0 ]]; do
         --artifacts-dir) ARTIFACTS_DIR="$2"; shift ;;
         --service-type) SERVICE_TYPE="$2"; shift ;;
         --endpoint-type) ENDPOINT_TYPE="$2"; shift ;;
+        --input-file) INPUT_FILE="$2"; shift ;;
         *) echo "Unknown parameter: $1"; exit 1 ;;
     esac
     shift
@@ -189,8 +190,29 @@ runBenchmark() {
     done
 }
 
+# Workload function: replays a payload file (timestamp, input_length, output_length per line) on its own schedule
+runWorkload() {
+    local export_file="${EXPORT_FILE_NAME}_workload.json"
+    printParametersBox "Workload" "trace" "per request" "per request" "$export_file"
+    genai-perf profile \
+        -m "$MODEL" \
+        --endpoint-type chat \
+        --streaming \
+        --random-seed 1234 \
+        -u "$URL" \
+        --input-file payload:"$INPUT_FILE" \
+        --extra-inputs ignore_eos:true \
+        --tokenizer "$TOKENIZER" \
+        --profile-export-file "$export_file" \
+        -v \
+        -- \
+        -v
+}
+
 # Check if --get-results is enabled
-if [[ "$GET_RESULTS" == true ]]; then
+if [[ -n "$INPUT_FILE" && "$GET_RESULTS" != true ]]; then
+    runWorkload
+elif [[ "$GET_RESULTS" == true ]]; then
     # Call getResults function with appropriate arguments
     for use_case in "${USE_CASES_LIST[@]}"; do
         if [[ -n "${useCases[$use_case]}" ]]; then
@@ -0,0 +1,121 @@
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from results_parser import FILE_TAG, parse_artifact, write_results_csv
+
+# Labels printed by bench.sh printParametersBox before every (use case, concurrency) point.
+BOX_START = "Benchmark Parameters:"
+BOX_FIELDS = {
+    "Use Case:": "use_case",
+    "Concurrency:": "concurrency",
+    "Input Tokens:": "input_tokens",
+    "Output Tokens:": "output_tokens",
+    "Export File:": "export_file",
+}
+FETCH_RETRIES = 3
+
+
+# Updates the point being parsed from one bench.sh output line; returns True when a new point starts.
+def parse_bench_line(line, point):
+    stripped = line.strip()
+    if stripped == BOX_START:
+        point.clear()
+        return True
+    for label, key in BOX_FIELDS.items():
+        if stripped.startswith(label):
+            point[key] = stripped[len(label):].strip()
+            break
+    return False
+
+
+# Returns the artifacts subdirectory and JSON file name genai-perf writes for one point.
+def point_artifact(point, model, service_type="openai", endpoint_type="chat"):
+    subdir = f"{model.replace('/', '_')}-{service_type}-{endpoint_type}-concurrency{point['concurrency']}"
+    file_name = f"{os.path.splitext(point['export_file'])[0]}{FILE_TAG}"
+    return subdir, file_name
+
+
+class BenchStreamer:
+    """Follows a running bench.sh and copies each point's JSON export as soon as the point finishes.
+
+    A point is finished when bench.sh prints the parameter box of the next point (or exits), so
+    the copy of one point overlaps with the measurement of the next.
+    """
+
+    def __init__(self, namespace, pod_name, model, pod_artifacts_path, destination_path, run_id):
+        self.namespace = namespace
+        self.pod_name = pod_name
+        self.model = model
+        self.pod_artifacts_path = pod_artifacts_path.rstrip("/")
+        self.destination_path = destination_path
+        self.run_id = run_id
+        self.partial_csv = os.path.join(destination_path, f"{run_id}-partial-results.csv")
+        self.fetched = []
+        self.rows = []
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=2)
+        self._futures = []
+
+    def _fetch(self, point):
+        subdir, file_name = point_artifact(point, self.model)
+        local_dir = os.path.join(self.destination_path, subdir)
+        os.makedirs(local_dir, exist_ok=True)
+        remote = f"{self.namespace}/{self.pod_name}:{self.pod_artifacts_path}/{subdir}/{file_name}"
+        local = os.path.join(local_dir, file_name)
+
+        for attempt in range(FETCH_RETRIES):
+            result = subprocess.run(["kubectl", "cp", remote, local],
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+            if result.returncode == 0 and os.path.isfile(local):
+                break
+            time.sleep(2 * (attempt + 1))
+        else:
+            print(f" Could not fetch artifact for {point['use_case']} @ {point['concurrency']}: {result.stderr.strip()}")
+            return
+
+        # Only the file just copied is parsed; the partial CSV is rebuilt from the rows accumulated so far
+        row = parse_artifact(local)
+        with self._lock:
+            self.fetched.append(local)
+            if row is not None:
+                self.rows.append(row)
+                self.rows.sort(key=lambda r: (r["use_case"], r["concurrency"]))
+            write_results_csv(self.rows, self.partial_csv)
+        print(f" Fetched {point['use_case']} @ concurrency {point['concurrency']} "
+              f"({len(self.fetched)} point(s) so far) → {local}")
+
+    def point_completed(self, point):
+        if "export_file" not in point or "concurrency" not in point:
+            return
+        print(f" Point finished: {point['use_case']} @ concurrency {point['concurrency']}, fetching artifact...")
+        self._futures.append(self._pool.submit(self._fetch, dict(point)))
+
+    # Runs the kubectl exec command, echoing its output and fetching artifacts point by point.
+    def run(self, exec_cmd):
+        point = {}
+        process = subprocess.Popen(exec_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   universal_newlines=True, bufsize=1)
+        try:
+            for line in process.stdout:
+                print(line.rstrip())
+                previous = dict(point)
+                if parse_bench_line(line, point) and previous:
+                    self.point_completed(previous)
+                elif line.strip().startswith("Export File:"):
+                    print(f" Running: {point.get('use_case')} @ concurrency {point.get('concurrency')}")
+            returncode = process.wait()
+            # The last point has no following box, it is complete once bench.sh exits
+            if point:
+                self.point_completed(point)
+        finally:
+            for future in self._futures:
+                future.result()
+            self._pool.shutdown()
+
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, exec_cmd)
+        print(f" Streamed {len(self.fetched)} artifact(s), partial results in {self.partial_csv}")
+        return self.fetched
@@ -0,0 +1,405 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import toml  # noqa: E402
+import yaml  # noqa: E402
+
+from fake_cluster import FakeApiServer, FakeCluster, calibrate_shim, install_shims  # noqa: E402
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+DEFAULT_SCENARIO = os.path.join(FIXTURES_DIR, "scenario.json")
+DEFAULT_HISTORY = os.path.join(BENCH_DIR, "orchestration_history.jsonl")
+
+# Per-stage metrics, in report order. Counts are deterministic for a scenario, times are medians over the repeats.
+COUNT_METRICS = ("subprocesses", "api_calls", "config_parses", "yaml_ops", "sleep_s")
+TIME_METRICS = ("wall_s", "api_s", "shim_s", "orchestration_s")
+
+_real_time = time.time
+_real_sleep = time.sleep
+
+
+class VirtualClock:
+    """Clock shared by the pipeline and the fake cluster.
+
+    Sleeps are recorded and only sleep_scale of them is actually slept; the rest advances the clock,
+    so polling loops see the scripted state transitions without the benchmark waiting for them.
+    """
+
+    def __init__(self, sleep_scale=0.0):
+        self.sleep_scale = sleep_scale
+        self.offset = 0.0
+        self.slept = 0.0
+
+    def time(self):
+        return _real_time() + self.offset
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        real = seconds * self.sleep_scale
+        self.offset += seconds - real
+        if real:
+            _real_sleep(real)
+
+
+class Probe:
+    """Counts what the pipeline spends its time on: process spawns, API calls, config and YAML parses, sleeps.
+
+    Every subprocess of the pipeline is a kubectl or curl shim, whose own start-up cost (shim_spawn_s, calibrated
+    per run) is harness overhead a real kubectl does not have; it is reported as shim_s, apart from orchestration_s.
+    """
+
+    def __init__(self, cluster, clock, shim_spawn_s=0.0):
+        self.cluster = cluster
+        self.clock = clock
+        self.shim_spawn_s = shim_spawn_s
+        self.counts = {"subprocesses": 0, "config_parses": 0, "yaml_ops": 0}
+
+    def snapshot(self):
+        return dict(self.counts, wall_s=time.perf_counter(), api_calls=sum(self.cluster.api_calls.values()),
+                    api_s=self.cluster.api_seconds, shim_s=self.counts["subprocesses"] * self.shim_spawn_s,
+                    sleep_s=self.clock.slept)
+
+    @staticmethod
+    def delta(before, after):
+        metrics = {key: after[key] - before[key] for key in before}
+        metrics["orchestration_s"] = metrics["wall_s"] - metrics["api_s"] - metrics["shim_s"]
+        return metrics
+
+    # Replaces the process, parsing and clock primitives with counting versions for the duration of the block.
+    @contextlib.contextmanager
+    def instrumented(self):
+        probe = self
+        real_popen = subprocess.Popen
+
+        class CountingPopen(real_popen):
+            def __init__(self, *args, **kwargs):
+                probe.counts["subprocesses"] += 1
+                super().__init__(*args, **kwargs)
+
+        def counting(name, function):
+            def wrapper(*args, **kwargs):
+                probe.counts[name] += 1
+                return function(*args, **kwargs)
+            return wrapper
+
+        patches = [
+            (subprocess, "Popen", CountingPopen),
+            (toml, "load", counting("config_parses", toml.load)),
+            (yaml, "safe_load", counting("yaml_ops", yaml.safe_load)),
+            (yaml, "safe_dump", counting("yaml_ops", yaml.safe_dump)),
+            (time, "sleep", self.clock.sleep),
+            (time, "time", self.clock.time),
+        ]
+        originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+        for module, name, replacement in patches:
+            setattr(module, name, replacement)
+        try:
+            yield self
+        finally:
+            for module, name, original in originals:
+                setattr(module, name, original)
+
+
+# Sends stdout and stderr (including those of child processes) to /dev/null.
+@contextlib.contextmanager
+def quiet_output(enabled=True):
+    if not enabled:
+        yield
+        return
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        os.dup2(devnull.fileno(), 2)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            for fd in saved:
+                os.close(fd)
+
+
+# Writes the benchmark TOML into the workspace with the fixture and workspace paths filled in.
+def write_config(workspace):
+    with open(os.path.join(FIXTURES_DIR, "user_input.toml"), "r") as f:
+        text = f.read().replace("@FIXTURES@", FIXTURES_DIR).replace("@WORKSPACE@", workspace)
+    config_path = os.path.join(workspace, "user_input.toml")
+    with open(config_path, "w") as f:
+        f.write(text)
+    return config_path, toml.loads(text)
+
+
+# Drops the per-process caches of the pipeline so every repeat starts cold.
+def reset_caches():
+    import config_loader
+    import main
+    import manifest_renderer
+
+    config_loader._config = None
+    main._api_keys_exported = False
+    manifest_renderer.clear_manifest_cache()
+
+
+# Manager-module cases, run in order against the cluster the pipeline case left behind.
+def module_cases():
+    import main
+    from autotune import autotune_profile
+    from config_loader import load_config, load_profile_list_config
+    from manifest_renderer import manifest_name
+    from pod_manager import create_pod, fetch_profile_pod_logs_and_update_toml
+    from pvc_manager import apply_pvc_yaml
+    from runtime_manager import render_deployment_manifests, wait_for_inference_service_ready
+    from toml_updater import update_cluster_ip_in_toml
+
+    def isvc_name():
+        return manifest_name(render_deployment_manifests()[1])
+
+    # The cleanup stage removed the list-profiles pod; recreate it as the profile stage does
+    def profile(namespace):
+        create_pod(load_profile_list_config(), namespace)
+        fetch_profile_pod_logs_and_update_toml(namespace)
+
+    # runtime_manager goes first: the pipeline does not wait for the InferenceService, and resume
+    # and reuse only skip the deployment once it is ready
+    return [
+        ("runtime_manager", lambda ns: wait_for_inference_service_ready(ns, isvc_name())),
+        ("toml_updater", update_cluster_ip_in_toml),
+        ("resume", lambda ns: main.main(resume=True)),
+        ("reuse_manager", lambda ns: main.can_reuse_deployment(ns)),
+        ("pvc_manager", lambda ns: apply_pvc_yaml(load_config()["pvc_details"], ns)),
+        ("pod_manager", profile),
+        ("scaling_manager", lambda ns: main.run_scaling(ns)),
+        ("workload", lambda ns: main.run_workload(ns)),
+        ("autotune", lambda ns: autotune_profile(ns, main.resolve_target_pod({"namespace": ns}))),
+    ]
+
+
+# Runs main.main() with every stage timed, then each manager-module case, against a fresh fake cluster.
+def run_once(scenario, sleep_scale=0.0, verbose=False):
+    import main
+
+    workspace = tempfile.mkdtemp(prefix="genai-perf-bench-")
+    saved_env, saved_cwd, saved_stages = dict(os.environ), os.getcwd(), main.STAGES
+    try:
+        config_path, config = write_config(workspace)
+        clock = VirtualClock(sleep_scale)
+        scenario = dict(scenario, served_model=config["final_exec"]["model"])
+        cluster = FakeCluster(scenario, os.path.join(workspace, "pods"), config["paths"]["pod_artifacts_path"], clock)
+        probe = Probe(cluster, clock)
+        results = {"pipeline": {}}
+
+        def timed_stage(name, run):
+            def stage(ctx):
+                before = probe.snapshot()
+                try:
+                    return run(ctx)
+                finally:
+                    results["pipeline"][name] = Probe.delta(before, probe.snapshot())
+            return stage
+
+        with FakeApiServer(cluster) as server:
+            os.environ["PATH"] = install_shims(os.path.join(workspace, "bin")) + os.pathsep + os.environ["PATH"]
+            os.environ["FAKE_KUBE_ADDR"] = server.address
+            probe.shim_spawn_s = calibrate_shim(os.path.join(workspace, "bin"))
+            os.environ["GENAI_PERF_CONFIG"] = config_path
+            # exec_into_genai_perf_pod copies bench.sh from the working directory
+            os.chdir(REPO_DIR)
+            reset_caches()
+            main.STAGES = [(name, timed_stage(name, run), validate) for name, run, validate in saved_stages]
+
+            with probe.instrumented(), quiet_output(not verbose):
+                before = probe.snapshot()
+                main.main()
+                results["pipeline"]["total"] = Probe.delta(before, probe.snapshot())
+                main.STAGES = saved_stages
+
+                namespace = config["constants"]["namespace"]
+                for name, case in module_cases():
+                    before = probe.snapshot()
+                    case(namespace)
+                    results[name] = {"total": Probe.delta(before, probe.snapshot())}
+        return results, probe.shim_spawn_s
+    finally:
+        main.STAGES = saved_stages
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+        reset_caches()
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+# Runs the suite repeat times and reduces it to one value per (case, stage, metric).
+def run_suite(scenario, repeat=3, sleep_scale=0.0, verbose=False):
+    runs, spawn_costs = zip(*(run_once(scenario, sleep_scale, verbose) for _ in range(repeat)))
+    cases = {}
+    for case, stages in runs[0].items():
+        cases[case] = {}
+        for stage in stages:
+            samples = [run[case][stage] for run in runs]
+            cases[case][stage] = {metric: round(statistics.median(s[metric] for s in samples), 4)
+                                  for metric in TIME_METRICS + COUNT_METRICS}
+    return cases, round(statistics.median(spawn_costs), 4)
+
+
+# Returns the short HEAD commit and whether tracked files differ from it, ignoring the history file itself.
+def git_revision(history_path=DEFAULT_HISTORY):
+    def git(*args):
+        result = subprocess.run(["git"] + list(args), cwd=REPO_DIR, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, universal_newlines=True)
+        return result.stdout.strip() if result.returncode == 0 else ""
+    status = ["status", "--porcelain", "--untracked-files=no", "--", "."]
+    history_path = os.path.abspath(history_path)
+    if history_path.startswith(REPO_DIR + os.sep):
+        status.append(f":(exclude){os.path.relpath(history_path, REPO_DIR)}")
+    return git("rev-parse", "--short", "HEAD") or "unknown", bool(git(*status))
+
+
+def load_history(history_path):
+    if not os.path.isfile(history_path):
+        return []
+    with open(history_path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(history_path, record):
+    with open(history_path, "a") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+# Returns the latest record of a commit, or the latest one from another commit than current when ref is None.
+# Timings only compare on the same machine, so with a current record only records from its host are considered.
+def find_baseline(history, ref=None, current=None):
+    for record in reversed(history):
+        if current is not None and record.get("host") != current.get("host"):
+            continue
+        if ref is not None and record["commit"].startswith(ref):
+            return record
+        if ref is None and (current is None or record["commit"] != current["commit"]):
+            return record
+    return None
+
+
+def print_results(record):
+    header = (f"{'Case':<16} {'Stage':<10} {'Wall s':>8} {'Orch s':>8} {'API s':>8} {'Shim s':>8} {'Sleep s':>8} "
+              f"{'Procs':>6} {'API':>6} {'TOML':>6} {'YAML':>6}")
+    print(f" Orchestration benchmark @ {record['commit']}{' (dirty)' if record['dirty'] else ''} "
+          f"on {record.get('host')}, scenario '{record['scenario']}', median of {record['repeat']}, "
+          f"{record.get('shim_spawn_s', 0) * 1000:.1f} ms per shim call")
+    print(header)
+    print("-" * len(header))
+    for case, stages in record["cases"].items():
+        for stage, m in stages.items():
+            print(f"{case:<16} {stage:<10} {m['wall_s']:>8.3f} {m['orchestration_s']:>8.3f} {m['api_s']:>8.3f} "
+                  f"{m.get('shim_s', 0):>8.3f} {m['sleep_s']:>8.0f} {m['subprocesses']:>6.0f} {m['api_calls']:>6.0f} {m['config_parses']:>6.0f} "
+                  f"{m['yaml_ops']:>6.0f}")
+
+
+# Lists every (case, stage, metric) that got worse: any count increase, or orchestration time
+# slower by more than threshold percent and min_seconds.
+def compare_records(baseline, current, threshold=20.0, min_seconds=0.05):
+    regressions = []
+    for case, stages in current["cases"].items():
+        for stage, metrics in stages.items():
+            old = baseline["cases"].get(case, {}).get(stage)
+            if old is None:
+                continue
+            for metric in COUNT_METRICS:
+                if metrics[metric] > old.get(metric, 0):
+                    regressions.append((case, stage, metric, old.get(metric, 0), metrics[metric]))
+            before, after = old["orchestration_s"], metrics["orchestration_s"]
+            if after - before > min_seconds and after > before * (1 + threshold / 100.0):
+                regressions.append((case, stage, "orchestration_s", before, after))
+    return regressions
+
+
+def print_comparison(baseline, current, regressions):
+    print(f"\n Compared with {baseline['commit']} ({baseline['recorded_at']}) on {baseline.get('host')}:")
+    if not regressions:
+        print(" No regressions.")
+        return
+    for case, stage, metric, before, after in regressions:
+        print(f" REGRESSION {case}/{stage} {metric}: {before} -> {after}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the orchestration overhead of the pipeline against a fake cluster.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the suite, store the result in the history and compare with the previous commit.")
+    run.add_argument("--scenario", default=DEFAULT_SCENARIO, help="Scripted latencies and state transitions (JSON).")
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--sleep-scale", type=float, default=0.0,
+                     help="Fraction of each polling sleep actually slept (0 skips them, 1 sleeps in real time).")
+    run.add_argument("--verbose", action="store_true", help="Show the pipeline output.")
+    run.add_argument("--no-save", action="store_true", help="Do not append the result to the history file.")
+    run.add_argument("--baseline", help="Commit to compare with (default: the latest record of another commit).")
+    run.add_argument("--fail-on-regression", action="store_true")
+
+    compare = sub.add_parser("compare", help="Compare two commits already in the history.")
+    compare.add_argument("baseline")
+    compare.add_argument("current", nargs="?", help="Defaults to the latest record.")
+    compare.add_argument("--fail-on-regression", action="store_true")
+
+    for p in (run, compare):
+        p.add_argument("--history", default=DEFAULT_HISTORY)
+        p.add_argument("--threshold", type=float, default=20.0, help="Allowed orchestration time increase, percent.")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    if args.command == "run":
+        with open(args.scenario, "r") as f:
+            scenario = json.load(f)
+        commit, dirty = git_revision(args.history)
+        cases, shim_spawn_s = run_suite(scenario, args.repeat, args.sleep_scale, args.verbose)
+        current = {
+            "commit": commit,
+            "dirty": dirty,
+            "host": platform.node(),
+            "recorded_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "scenario": scenario.get("name", os.path.basename(args.scenario)),
+            "repeat": args.repeat,
+            "sleep_scale": args.sleep_scale,
+            "shim_spawn_s": shim_spawn_s,
+            "cases": cases,
+        }
+        print_results(current)
+        baseline = find_baseline(history, args.baseline, current)
+        if not args.no_save:
+            append_history(args.history, current)
+            print(f" Result appended to {args.history}")
+    else:
+        current = find_baseline(history, args.current) if args.current else (history[-1] if history else None)
+        if current is None:
+            sys.exit(" No benchmark record to compare.")
+        baseline = find_baseline(history, args.baseline, current)
+        print_results(current)
+
+    if baseline is None:
+        print("\n No baseline record to compare with.")
+        return 0
+    regressions = compare_records(baseline, current, args.threshold)
+    print_comparison(baseline, current, regressions)
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,515 @@
+import copy
+import fnmatch
+import json
+import os
+import shutil
+import stat
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from time import sleep as real_sleep
+
+import yaml
+
+from workload import load_use_cases
+
+# kubectl flags that never take a value; every other --flag without '=' consumes the next token.
+BOOLEAN_FLAGS = {"--no-headers", "--show-labels", "--overwrite", "--ignore-not-found", "--all"}
+SHORT_FLAGS = {"-n": "namespace", "-f": "filename", "-o": "output", "-l": "selector", "-p": "patch", "-c": "container"}
+
+KIND_ALIASES = {
+    "ns": "Namespace", "namespace": "Namespace", "namespaces": "Namespace",
+    "pod": "Pod", "pods": "Pod",
+    "secret": "Secret", "secrets": "Secret",
+    "pvc": "PersistentVolumeClaim", "persistentvolumeclaim": "PersistentVolumeClaim",
+    "persistentvolumeclaims": "PersistentVolumeClaim",
+    "svc": "Service", "service": "Service", "services": "Service",
+    "isvc": "InferenceService", "inferenceservice": "InferenceService", "inferenceservices": "InferenceService",
+    "clusterservingruntime": "ClusterServingRuntime", "clusterservingruntimes": "ClusterServingRuntime",
+    "job": "Job", "jobs": "Job",
+}
+CLUSTER_SCOPED = {"Namespace", "ClusterServingRuntime"}
+# Shim argv answered immediately and not counted, used to time the spawn cost of the shim itself.
+CALIBRATION_ARGV = ["--fake-calibrate"]
+ISVC_LABEL = "serving.kserve.io/inferenceservice"
+
+# Client installed as 'kubectl' and 'curl': forwards its argv (and the manifest on stdin) to the fake API server.
+SHIM_TEMPLATE = """#!{python} -S
+import http.client, json, os, sys
+argv = sys.argv[1:]
+stdin = sys.stdin.read() if "-f" in argv and argv[argv.index("-f") + 1:argv.index("-f") + 2] == ["-"] else None
+host, port = os.environ["FAKE_KUBE_ADDR"].rsplit(":", 1)
+conn = http.client.HTTPConnection(host, int(port))
+conn.request("POST", "/run", json.dumps({{"tool": os.path.basename(sys.argv[0]), "argv": argv,
+                                          "stdin": stdin, "cwd": os.getcwd()}}))
+reply = json.loads(conn.getresponse().read())
+sys.stdout.write(reply["stdout"])
+sys.stderr.write(reply["stderr"])
+sys.exit(reply["returncode"])
+"""
+
+
+class CommandError(Exception):
+    def __init__(self, message, returncode=1):
+        super().__init__(message)
+        self.returncode = returncode
+
+
+# Splits a kubectl argv into positional arguments, flags and the command after '--'.
+def parse_kubectl_args(argv):
+    command = []
+    if "--" in argv:
+        index = argv.index("--")
+        argv, command = argv[:index], argv[index + 1:]
+    positional, flags = [], {}
+    tokens = iter(argv)
+    for token in tokens:
+        if token in SHORT_FLAGS:
+            flags[SHORT_FLAGS[token]] = next(tokens, "")
+        elif token.startswith("--"):
+            if "=" in token:
+                key, value = token[2:].split("=", 1)
+                flags[key] = value
+            elif token in BOOLEAN_FLAGS:
+                flags[token[2:]] = True
+            else:
+                flags[token[2:]] = next(tokens, "")
+        else:
+            positional.append(token)
+    return positional, flags, command
+
+
+# Applies an RFC 7386 JSON merge patch in place.
+def merge_patch(target, patch):
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge_patch(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+# Synthetic genai-perf metrics for one (use case, concurrency) point.
+def synthetic_metrics(input_tokens, output_tokens, concurrency):
+    ttft = 20.0 + input_tokens / 100.0 * (1 + concurrency / 32.0)
+    itl = 8.0 * (1 + concurrency / 64.0)
+    latency = ttft + output_tokens * itl
+
+    def stats(value):
+        return {"avg": value, "min": value * 0.8, "max": value * 1.5, "p90": value * 1.2, "unit": "ms"}
+    return {
+        "time_to_first_token": stats(ttft),
+        "inter_token_latency": stats(itl),
+        "request_latency": stats(latency),
+        "output_token_throughput": {"avg": concurrency * output_tokens / (latency / 1000.0), "unit": "tokens/sec"},
+        "request_throughput": {"avg": concurrency / (latency / 1000.0), "unit": "requests/sec"},
+        "request_count": {"avg": concurrency * 4, "unit": "count"},
+    }
+
+
+class FakeCluster:
+    """In-memory Kubernetes state answering the kubectl and curl calls of the pipeline.
+
+    Objects become ready after the scripted ready_after_s of cluster time (read from clock), every call
+    waits its scripted latency, and pod file systems are directories under pod_root.
+    """
+
+    def __init__(self, scenario, pod_root, pod_artifacts_path, clock):
+        self.scenario = scenario
+        self.pod_root = pod_root
+        self.pod_artifacts_path = pod_artifacts_path
+        self.clock = clock
+        self.objects = {}
+        self.api_calls = Counter()
+        self.api_seconds = 0.0
+        self._lock = threading.Lock()
+        self._next_ip = 10
+
+    # Entry point of the API server: runs one shim invocation and returns (returncode, stdout, stderr).
+    def handle(self, tool, argv, stdin, cwd):
+        if argv == CALIBRATION_ARGV:
+            return 0, "", ""
+        verb = "curl" if tool == "curl" else (argv[0] if argv else "")
+        latency = self.scenario["latency_ms"].get(verb, self.scenario["latency_ms"]["default"]) / 1000.0
+        real_sleep(latency)
+        with self._lock:
+            self.api_calls[verb] += 1
+            self.api_seconds += latency
+            try:
+                if tool == "curl":
+                    return 0, self._curl(argv), ""
+                positional, flags, command = parse_kubectl_args(argv)
+                handler = getattr(self, f"_kubectl_{verb}", None)
+                if handler is None:
+                    return 0, "", ""
+                return 0, handler(positional[1:], flags, command, stdin, cwd) or "", ""
+            except CommandError as e:
+                return e.returncode, "", f"{e}\n"
+
+    def _wait(self, seconds):
+        # Cluster-side work such as a benchmark point; counts as API time, not as harness time
+        real_sleep(seconds)
+        self.api_seconds += seconds
+
+    def _key(self, kind, namespace, name):
+        return kind, "" if kind in CLUSTER_SCOPED else namespace, name
+
+    def _age(self, obj, field="created_at"):
+        return self.clock.time() - obj[field]
+
+    def _ready_after(self, name):
+        return self.scenario["ready_after_s"].get(name, 0)
+
+    def _store(self, manifest, namespace):
+        kind = manifest["kind"]
+        name = manifest["metadata"]["name"]
+        manifest.setdefault("metadata", {})["namespace"] = None if kind in CLUSTER_SCOPED else namespace
+        now = self.clock.time()
+        self.objects[self._key(kind, namespace, name)] = {"manifest": manifest, "created_at": now, "changed_at": now}
+        if kind == "InferenceService":
+            for suffix, service_type in (("-predictor-00001-private", "ClusterIP"), ("", "ExternalName")):
+                self._next_ip += 1
+                service = {"apiVersion": "v1", "kind": "Service",
+                           "metadata": {"name": f"{name}{suffix}", "labels": {ISVC_LABEL: name}},
+                           "spec": {"type": service_type, "clusterIP": f"10.96.0.{self._next_ip}"}}
+                self._store(service, namespace)
+
+    def _delete(self, kind, namespace, name):
+        obj = self.objects.pop(self._key(kind, namespace, name), None)
+        if obj is None:
+            return False
+        if kind == "InferenceService":
+            for key in [k for k, o in self.objects.items()
+                        if k[0] == "Service" and o["manifest"]["metadata"].get("labels", {}).get(ISVC_LABEL) == name]:
+                del self.objects[key]
+        return True
+
+    def _find(self, kind, namespace, name):
+        obj = self.objects.get(self._key(kind, namespace, name))
+        if obj is None:
+            raise CommandError(f'Error from server (NotFound): {kind.lower()}s "{name}" not found')
+        return obj
+
+    # Returns a copy of a stored object with the status it has at the current cluster time.
+    def _view(self, kind, obj):
+        manifest = copy.deepcopy(obj["manifest"])
+        if kind == "Pod":
+            name = manifest["metadata"]["name"]
+            if "profile" in name:
+                phase = "Succeeded" if self._age(obj) >= self._ready_after("profile_pod") else "Running"
+            else:
+                phase = "Running" if self._age(obj) >= self._ready_after("Pod") else "Pending"
+            manifest["status"] = {"phase": phase,
+                                  "containerStatuses": [{"name": name, "ready": phase == "Running"}]}
+        elif kind == "InferenceService":
+            ready = self._age(obj, "changed_at") >= self._ready_after("InferenceService")
+            manifest["status"] = {"conditions": [{"type": "Ready", "status": "True" if ready else "False"}]}
+        elif kind == "Job":
+            done = self._age(obj) >= self._ready_after("Job")
+            manifest["status"] = {"succeeded": 1} if done else {"active": 1}
+        return manifest
+
+    # Predictor pods of every InferenceService: minReplicas pods, ready once the InferenceService is.
+    def _predictor_pods(self, namespace):
+        pods = []
+        for (kind, ns, name), obj in self.objects.items():
+            if kind != "InferenceService" or ns != namespace:
+                continue
+            ready = self._age(obj, "changed_at") >= self._ready_after("InferenceService")
+            replicas = obj["manifest"]["spec"]["predictor"].get("minReplicas") or 1
+            for i in range(replicas):
+                pod_name = f"{name}-predictor-00001-deployment-{i}"
+                pods.append({"apiVersion": "v1", "kind": "Pod",
+                             "metadata": {"name": pod_name, "namespace": namespace, "labels": {ISVC_LABEL: name}},
+                             "status": {"phase": "Running" if ready else "Pending",
+                                        "containerStatuses": [{"name": "kserve-container", "ready": ready}]}})
+        return pods
+
+    def _list(self, kind, namespace, selector=None):
+        items = [self._view(kind, obj) for (k, ns, _), obj in self.objects.items()
+                 if k == kind and (kind in CLUSTER_SCOPED or ns == namespace)]
+        if kind == "Pod":
+            items += self._predictor_pods(namespace)
+        if selector:
+            key, _, value = selector.partition("=")
+            items = [i for i in items if i["metadata"].get("labels", {}).get(key) == value]
+        return items
+
+    def _table(self, kind, items, flags):
+        if kind == "Pod":
+            header = ["NAME", "READY", "STATUS", "RESTARTS", "AGE"]
+            status = {"Succeeded": "Completed"}
+            rows = [[i["metadata"]["name"], "1/1" if i["status"]["phase"] == "Running" else "0/1",
+                     status.get(i["status"]["phase"], i["status"]["phase"]), "0", "1m"] for i in items]
+        elif kind == "Service":
+            header = ["NAME", "TYPE", "CLUSTER-IP", "EXTERNAL-IP", "PORT(S)", "AGE"]
+            rows = [[i["metadata"]["name"], i["spec"]["type"], i["spec"]["clusterIP"], "<none>", "80/TCP", "1m"]
+                    for i in items]
+        elif kind == "Namespace":
+            header = ["NAME", "STATUS", "AGE"] + (["LABELS"] if flags.get("show-labels") else [])
+            rows = [[i["metadata"]["name"], "Active", "1m"] +
+                    ([",".join(f"{k}={v}" for k, v in i["metadata"].get("labels", {}).items()) or "<none>"]
+                     if flags.get("show-labels") else []) for i in items]
+        else:
+            header = ["NAME", "AGE"]
+            rows = [[i["metadata"]["name"], "1m"] for i in items]
+        lines = [] if flags.get("no-headers") else ["   ".join(header)]
+        lines += ["   ".join(row) for row in rows]
+        return "\n".join(lines) + "\n"
+
+    def _manifests(self, flags, stdin, cwd):
+        source = flags["filename"]
+        if source == "-":
+            text = stdin or ""
+        else:
+            with open(os.path.join(cwd, source), "r") as f:
+                text = f.read()
+        return [m for m in yaml.safe_load_all(text) if m]
+
+    def _kubectl_get(self, args, flags, command, stdin, cwd):
+        kind = KIND_ALIASES[args[0].lower()]
+        namespace = flags.get("namespace", "default")
+        output = flags.get("output", "")
+        if len(args) > 1:
+            result = self._view(kind, self._find(kind, namespace, args[1]))
+            items = [result]
+        else:
+            items = self._list(kind, namespace, flags.get("selector"))
+            result = {"apiVersion": "v1", "kind": "List", "items": items}
+        if output == "json":
+            return json.dumps(result)
+        if output.startswith("jsonpath="):
+            return " ".join(i["metadata"]["name"] for i in items)
+        return self._table(kind, items, flags)
+
+    def _kubectl_create(self, args, flags, command, stdin, cwd):
+        namespace = flags.get("namespace", "default")
+        if "filename" in flags:
+            manifests = self._manifests(flags, stdin, cwd)
+        elif args[0] in ("ns", "namespace"):
+            manifests = [{"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": args[1]}, "spec": {}}]
+        elif args[0] == "secret":
+            manifests = [{"apiVersion": "v1", "kind": "Secret", "type": args[1], "metadata": {"name": args[2]}}]
+        else:
+            raise CommandError(f"error: unsupported create: {args}")
+        created = []
+        for manifest in manifests:
+            kind, name = manifest["kind"], manifest["metadata"]["name"]
+            if self._key(kind, namespace, name) in self.objects:
+                raise CommandError(f'Error from server (AlreadyExists): {kind.lower()}s "{name}" already exists')
+            self._store(manifest, namespace)
+            created.append(f"{kind.lower()}/{name} created")
+        return "\n".join(created) + "\n"
+
+    def _kubectl_apply(self, args, flags, command, stdin, cwd):
+        namespace = flags.get("namespace", "default")
+        lines = []
+        for manifest in self._manifests(flags, stdin, cwd):
+            kind, name = manifest["kind"], manifest["metadata"]["name"]
+            existing = self.objects.get(self._key(kind, namespace, name))
+            if existing is None:
+                self._store(manifest, namespace)
+                lines.append(f"{kind.lower()}/{name} created")
+            else:
+                existing["manifest"]["spec"] = manifest.get("spec", {})
+                lines.append(f"{kind.lower()}/{name} configured")
+        return "\n".join(lines) + "\n"
+
+    def _kubectl_delete(self, args, flags, command, stdin, cwd):
+        namespace = flags.get("namespace", "default")
+        if "filename" in flags:
+            targets = [(m["kind"], m["metadata"]["name"]) for m in self._manifests(flags, stdin, cwd)]
+        else:
+            targets = [(KIND_ALIASES[args[0].lower()], args[1])]
+        lines = []
+        for kind, name in targets:
+            if self._delete(kind, namespace, name):
+                lines.append(f'{kind.lower()} "{name}" deleted')
+            elif not flags.get("ignore-not-found"):
+                raise CommandError(f'Error from server (NotFound): {kind.lower()}s "{name}" not found')
+        return "\n".join(lines) + "\n"
+
+    def _set_metadata(self, field, action, args, flags):
+        kind = KIND_ALIASES[args[0].lower()]
+        obj = self._find(kind, flags.get("namespace", "default"), args[1])
+        values = obj["manifest"]["metadata"].setdefault(field, {})
+        for pair in args[2:]:
+            key, _, value = pair.partition("=")
+            values[key] = value
+        return f"{kind.lower()}/{args[1]} {action}\n"
+
+    def _kubectl_label(self, args, flags, command, stdin, cwd):
+        return self._set_metadata("labels", "labeled", args, flags)
+
+    def _kubectl_annotate(self, args, flags, command, stdin, cwd):
+        return self._set_metadata("annotations", "annotated", args, flags)
+
+    def _kubectl_patch(self, args, flags, command, stdin, cwd):
+        kind = KIND_ALIASES[args[0].lower()]
+        obj = self._find(kind, flags.get("namespace", "default"), args[1])
+        merge_patch(obj["manifest"], json.loads(flags["patch"]))
+        obj["changed_at"] = self.clock.time()
+        return f"{kind.lower()}/{args[1]} patched\n"
+
+    def _kubectl_logs(self, args, flags, command, stdin, cwd):
+        self._find("Pod", flags.get("namespace", "default"), args[0])
+        return "\n".join(self.scenario["profile_log"]) + "\n"
+
+    def _pod_path(self, pod, path):
+        return os.path.join(self.pod_root, pod, path.lstrip("/"))
+
+    def _kubectl_exec(self, args, flags, command, stdin, cwd):
+        pod = args[0]
+        self._find("Pod", flags.get("namespace", "default"), pod)
+        if command[:2] == ["bash", "-c"]:
+            if command[2].startswith("mkdir -p "):
+                os.makedirs(self._pod_path(pod, command[2][len("mkdir -p "):]), exist_ok=True)
+            return ""
+        if command[0] == "chmod":
+            if not os.path.exists(self._pod_path(pod, command[-1])):
+                raise CommandError(f"chmod: cannot access '{command[-1]}': No such file or directory")
+            return ""
+        if command[0] == "find":
+            root, pattern = self._pod_path(pod, command[1]), command[command.index("-name") + 1]
+            matches = [os.path.join(d, f) for d, _, files in os.walk(root) for f in files if fnmatch.fnmatch(f, pattern)]
+            return "\n".join(matches) + ("\n" if matches else "")
+        if command[0] == "bash":
+            script = self._pod_path(pod, command[1])
+            if not os.path.isfile(script):
+                raise CommandError(f"bash: {command[1]}: No such file or directory", returncode=127)
+            return self._bench(pod, script, dict(zip(command[2::2], command[3::2])))
+        return ""
+
+    def _kubectl_cp(self, args, flags, command, stdin, cwd):
+        source, destination = args
+
+        def remote(path):
+            pod_ref, _, pod_path = path.partition(":")
+            return self._pod_path(pod_ref.split("/")[-1], pod_path)
+
+        if ":" in source:
+            source, destination = remote(source), os.path.join(cwd, destination)
+        else:
+            source, destination = os.path.join(cwd, source), remote(destination)
+        if not os.path.exists(source):
+            raise CommandError(f"error: {source} no such file or directory")
+        if os.path.isdir(source):
+            shutil.copytree(source, destination, dirs_exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+            shutil.copy2(source, destination)
+        return ""
+
+    def _curl(self, argv):
+        return json.dumps({"object": "list", "data": [{"id": self.scenario["served_model"], "object": "model"}]})
+
+    # Emulates bench.sh: prints the parameter box of every point and writes its genai-perf export into the pod.
+    def _bench(self, pod, script, options):
+        model = options["--model"]
+        export = options["--export-file-name"]
+        artifacts = self._pod_path(pod, self.pod_artifacts_path)
+        if "--input-file" in options:
+            return self._replay(pod, model, export, artifacts, options["--input-file"])
+
+        use_cases = load_use_cases(script)
+        lines = []
+        for use_case in options["--use-cases"].split(","):
+            input_tokens, output_tokens = use_cases[use_case]
+            for concurrency in options["--concurrency-values"].split(","):
+                export_file = f"{export}_{use_case}_{concurrency}_{input_tokens}_{output_tokens}.json"
+                lines += ["=" * 40, "Benchmark Parameters:", "-" * 40, f"Use Case:          {use_case}",
+                          f"Concurrency:       {concurrency}", f"Input Tokens:      {input_tokens}",
+                          f"Output Tokens:     {output_tokens}", f"Export File:       {export_file}", "=" * 40]
+                self._wait(self.scenario["bench_point_ms"] / 1000.0)
+                point_dir = os.path.join(artifacts, f"{model.replace('/', '_')}-openai-chat-concurrency{concurrency}")
+                os.makedirs(point_dir, exist_ok=True)
+                with open(os.path.join(point_dir, f"{os.path.splitext(export_file)[0]}_genai_perf.json"), "w") as f:
+                    json.dump(synthetic_metrics(input_tokens, output_tokens, int(concurrency)), f)
+        return "\n".join(lines) + "\n"
+
+    # Emulates the bench.sh --input-file mode: one profile export with per-request timestamps.
+    def _replay(self, pod, model, export, artifacts, input_file):
+        requests = []
+        with open(self._pod_path(pod, input_file), "r") as f:
+            for line in f:
+                payload = json.loads(line)
+                start = payload["timestamp"] * 1_000_000
+                metrics = synthetic_metrics(payload["input_length"], payload["output_length"], 1)
+                ttft = metrics["time_to_first_token"]["avg"] * 1e6
+                latency = metrics["request_latency"]["avg"] * 1e6
+                responses = min(payload["output_length"], 8)
+                requests.append({"timestamp": start, "response_timestamps": [
+                    int(start + ttft + (latency - ttft) * i / max(responses - 1, 1)) for i in range(responses)]})
+        self._wait(self.scenario["bench_point_ms"] / 1000.0)
+        replay_dir = os.path.join(artifacts, f"{model.replace('/', '_')}-openai-chat-payload")
+        os.makedirs(replay_dir, exist_ok=True)
+        with open(os.path.join(replay_dir, f"{export}_workload.json"), "w") as f:
+            json.dump({"experiments": [{"experiment": {"mode": "payload"}, "requests": requests}]}, f)
+        return "\n".join(["=" * 40, "Benchmark Parameters:", "Use Case:          Workload",
+                          "Concurrency:       trace", f"Export File:       {export}_workload.json", "=" * 40]) + "\n"
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        returncode, stdout, stderr = self.server.cluster.handle(request["tool"], request["argv"], request["stdin"],
+                                                                request["cwd"])
+        body = json.dumps({"returncode": returncode, "stdout": stdout, "stderr": stderr}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeApiServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, cluster):
+        super().__init__(("127.0.0.1", 0), FakeApiHandler)
+        self.cluster = cluster
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        return f"{self.server_address[0]}:{self.server_address[1]}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+# Writes the kubectl and curl shims into bin_dir; put bin_dir first on PATH to route calls to the fake server.
+def install_shims(bin_dir):
+    os.makedirs(bin_dir, exist_ok=True)
+    for tool in ("kubectl", "curl"):
+        path = os.path.join(bin_dir, tool)
+        with open(path, "w") as f:
+            f.write(SHIM_TEMPLATE.format(python=sys.executable))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return bin_dir
+
+
+# Returns the median seconds one shim invocation costs the caller (interpreter start, connect, reply)
+# against an already running server, so the harness can tell it apart from pipeline overhead.
+def calibrate_shim(bin_dir, samples=20):
+    shim = os.path.join(bin_dir, "kubectl")
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        subprocess.run([shim] + CALIBRATION_ARGV, check=True)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
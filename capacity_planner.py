@@ -0,0 +1,223 @@
+import argparse
+import json
+import math
+import os
+import sys
+
+import numpy as np
+import toml
+
+from results_parser import collect_results
+
+# SLO option -> result column it constrains. All latencies are in milliseconds, as exported by genai-perf.
+SLO_COLUMNS = {
+    "ttft_ms": "ttft_p90",
+    "itl_ms": "itl_p90",
+    "latency_ms": "latency_p90",
+}
+DEFAULT_LATENCY_COLUMN = "latency_p90"
+THROUGHPUT_COLUMN = "output_token_throughput"
+
+
+# Averages repeated measurements of the same concurrency and returns columns sorted by concurrency.
+def aggregate_sweep(rows, columns):
+    concurrency = np.array([r["concurrency"] for r in rows], dtype=float)
+    levels, inverse = np.unique(concurrency, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(levels))
+
+    table = {"concurrency": levels}
+    for column in columns:
+        values = np.array([np.nan if r.get(column) is None else r[column] for r in rows], dtype=float)
+        valid = ~np.isnan(values)
+        sums = np.bincount(inverse[valid], weights=values[valid], minlength=len(levels))
+        n = np.bincount(inverse[valid], minlength=len(levels))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            table[column] = np.where(n > 0, sums / n, np.nan)
+    table["samples"] = counts
+    return table
+
+
+# Returns the indices of the points on the throughput-versus-latency Pareto frontier, ordered by latency.
+def pareto_frontier(throughput, latency):
+    valid = ~(np.isnan(throughput) | np.isnan(latency))
+    candidates = np.flatnonzero(valid)
+    # Ascending latency, descending throughput for equal latency
+    order = candidates[np.lexsort((-throughput[candidates], latency[candidates]))]
+    ordered = throughput[order]
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], ordered[:-1])))
+    return order[ordered > best_before]
+
+
+# Interpolates, for every SLO at once, the highest concurrency whose metric still meets the SLO.
+# Metrics are assumed to grow with concurrency; the first violation ends the feasible range.
+def max_concurrency_within_slos(concurrency, metrics, limits):
+    metrics = np.atleast_2d(metrics)
+    limits = np.asarray(limits, dtype=float)[:, None]
+    violated = ~(metrics <= limits)
+
+    any_violation = violated.any(axis=1)
+    first_bad = np.where(any_violation, violated.argmax(axis=1), len(concurrency))
+
+    result = np.full(len(limits), float(concurrency[-1]))
+    interior = any_violation & (first_bad > 0)
+    if interior.any():
+        rows = np.flatnonzero(interior)
+        hi = first_bad[rows]
+        lo = hi - 1
+        m_lo, m_hi = metrics[rows, lo], metrics[rows, hi]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.where(m_hi > m_lo, (limits[rows, 0] - m_lo) / (m_hi - m_lo), 0.0)
+        frac = np.clip(np.nan_to_num(frac), 0.0, 1.0)
+        result[rows] = concurrency[lo] + frac * (concurrency[hi] - concurrency[lo])
+    result[any_violation & (first_bad == 0)] = np.nan
+    return result, ~any_violation
+
+
+# Builds the capacity report of one use case from its aggregated sweep table.
+def plan_use_case(table, slos, target_concurrency=None, target_tokens_per_s=None,
+                  latency_column=DEFAULT_LATENCY_COLUMN):
+    concurrency = table["concurrency"]
+    throughput = table[THROUGHPUT_COLUMN]
+    latency = table[latency_column]
+
+    frontier = pareto_frontier(throughput, latency)
+    report = {
+        "points": int(len(concurrency)),
+        "pareto_frontier": [
+            {"concurrency": int(concurrency[i]), "output_token_throughput": float(throughput[i]),
+             latency_column: float(latency[i])}
+            for i in frontier
+        ],
+    }
+
+    active = [(name, SLO_COLUMNS[name], limit) for name, limit in slos.items() if limit is not None]
+    if not active:
+        return report
+
+    metrics = np.vstack([table[column] for _, column, _ in active])
+    limits, within_sweep = max_concurrency_within_slos(concurrency, metrics, [limit for _, _, limit in active])
+
+    per_slo = {name: (None if np.isnan(c) else float(c)) for (name, _, _), c in zip(active, limits)}
+    if np.isnan(limits).any():
+        max_conc = None
+    else:
+        max_conc = float(limits.min())
+    report["max_concurrency_per_slo"] = per_slo
+
+    if max_conc is None:
+        report.update({"max_concurrency_within_slo": None, "limiting_slo":
+                       [name for name, c in per_slo.items() if c is None]})
+        return report
+
+    valid = ~np.isnan(throughput)
+    max_tokens = float(np.interp(max_conc, concurrency[valid], throughput[valid])) if valid.any() else None
+    report.update({
+        "max_concurrency_within_slo": max_conc,
+        "output_token_throughput_within_slo": max_tokens,
+        "limiting_slo": active[int(limits.argmin())][0],
+        # True when no SLO was violated in the sweep, i.e. the real limit may be higher than measured
+        "bounded_by_sweep": bool(within_sweep[int(limits.argmin())]),
+    })
+
+    replicas = {}
+    if target_concurrency and max_conc > 0:
+        replicas["for_target_concurrency"] = math.ceil(target_concurrency / max_conc)
+    if target_tokens_per_s and max_tokens:
+        replicas["for_target_tokens_per_s"] = math.ceil(target_tokens_per_s / max_tokens)
+    if replicas:
+        replicas["required"] = max(replicas.values())
+        report["replicas"] = replicas
+    return report
+
+
+# Builds the capacity report for every use case in the result rows.
+def build_capacity_report(rows, slos=None, target_concurrency=None, target_tokens_per_s=None,
+                          latency_column=DEFAULT_LATENCY_COLUMN):
+    slos = {name: (slos or {}).get(name) for name in SLO_COLUMNS}
+    columns = sorted({THROUGHPUT_COLUMN, latency_column} | set(SLO_COLUMNS.values()))
+
+    by_use_case = {}
+    for row in rows:
+        by_use_case.setdefault(row["use_case"], []).append(row)
+
+    return {
+        "slo": slos,
+        "targets": {"concurrency": target_concurrency, "output_tokens_per_s": target_tokens_per_s},
+        "latency_metric": latency_column,
+        "use_cases": {
+            use_case: plan_use_case(aggregate_sweep(use_case_rows, columns), slos, target_concurrency,
+                                    target_tokens_per_s, latency_column)
+            for use_case, use_case_rows in sorted(by_use_case.items())
+        },
+    }
+
+
+# Reads SLOs and targets from the [capacity] section of the TOML configuration.
+def capacity_settings(config):
+    capacity = config.get("capacity", {})
+    return {
+        "slos": {name: capacity.get(name) for name in SLO_COLUMNS},
+        "target_concurrency": capacity.get("target_concurrency"),
+        "target_tokens_per_s": capacity.get("target_tokens_per_s"),
+        "latency_column": capacity.get("latency_metric", DEFAULT_LATENCY_COLUMN),
+    }
+
+
+# Writes the capacity report of one run next to its artifacts and returns the report path.
+def write_capacity_report(artifacts_dir, run_id, config):
+    rows = collect_results(artifacts_dir, export_file_name=run_id)
+    if not rows:
+        print(f" No results found for run '{run_id}', skipping capacity report.")
+        return None
+
+    settings = capacity_settings(config)
+    report = build_capacity_report(rows, settings["slos"], settings["target_concurrency"],
+                                   settings["target_tokens_per_s"], settings["latency_column"])
+    report["run_id"] = run_id
+
+    report_path = os.path.join(artifacts_dir, f"{run_id}-capacity.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f" Capacity report written to {report_path}")
+    return report_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capacity-planning report from a GenAI-Perf sweep.")
+    parser.add_argument("--artifacts-dir", required=True)
+    parser.add_argument("--run-id", help="Only use the exports of this run (export file name with timestamp).")
+    parser.add_argument("--config", help="Read SLOs and targets from the [capacity] section of this TOML.")
+    parser.add_argument("--ttft-ms", type=float)
+    parser.add_argument("--itl-ms", type=float)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--latency-metric", default=None, help=f"Latency column of the frontier, default {DEFAULT_LATENCY_COLUMN}.")
+    parser.add_argument("--target-concurrency", type=int)
+    parser.add_argument("--target-tokens-per-s", type=float)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    settings = capacity_settings(toml.load(args.config) if args.config else {})
+    for name in SLO_COLUMNS:
+        if getattr(args, name) is not None:
+            settings["slos"][name] = getattr(args, name)
+    settings["target_concurrency"] = args.target_concurrency or settings["target_concurrency"]
+    settings["target_tokens_per_s"] = args.target_tokens_per_s or settings["target_tokens_per_s"]
+    settings["latency_column"] = args.latency_metric or settings["latency_column"]
+
+    rows = collect_results(args.artifacts_dir, export_file_name=args.run_id)
+    if not rows:
+        sys.exit(f" No genai-perf results found under {args.artifacts_dir}")
+
+    report = build_capacity_report(rows, settings["slos"], settings["target_concurrency"],
+                                   settings["target_tokens_per_s"], settings["latency_column"])
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f" Capacity report written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+import time
+
+import toml
+
+from config_loader import get_user_input_path, load_config
+
+# Values the pipeline writes back into the TOML itself; they must not invalidate a checkpoint.
+_RUNTIME_KEYS = {("values", None), ("profile", "selected_model_id")}
+
+
+# Returns the state file of the current configuration, next to its TOML unless [paths] state_file is set.
+def get_state_path(namespace):
+    state_file = load_config().get("paths", {}).get("state_file")
+    if state_file:
+        return state_file
+    return os.path.join(os.path.dirname(os.path.abspath(get_user_input_path())),
+                        f".genai_perf_state.{namespace}.json")
+
+
+# Hashes the user-controlled part of the configuration.
+def config_fingerprint(config):
+    stable = {}
+    for section, values in config.items():
+        if (section, None) in _RUNTIME_KEYS:
+            continue
+        if isinstance(values, dict):
+            values = {k: v for k, v in values.items() if (section, k) not in _RUNTIME_KEYS}
+        stable[section] = values
+    return hashlib.sha256(toml.dumps(stable).encode()).hexdigest()
+
+
+# Loads the state file, returning an empty state when it is missing, unreadable or from another configuration.
+def load_state(state_path, fingerprint):
+    empty = {"config_fingerprint": fingerprint, "stages": {}}
+    if not os.path.isfile(state_path):
+        return empty
+    try:
+        with open(state_path, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f" Ignoring unreadable state file {state_path}: {e}")
+        return empty
+    if state.get("config_fingerprint") != fingerprint:
+        print(f" Configuration changed since {state_path} was written. Ignoring saved stages.")
+        return empty
+    state.setdefault("stages", {})
+    return state
+
+
+# Writes the state file atomically so an interrupted run never leaves it half written.
+def save_state(state_path, state):
+    state["updated_at"] = time.time()
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+# Records a completed stage and drops every later stage, whose outputs may depend on it.
+def record_stage(state_path, state, stage_names, name, outputs):
+    for later in stage_names[stage_names.index(name) + 1:]:
+        state["stages"].pop(later, None)
+    state["stages"][name] = {"outputs": outputs, "completed_at": time.time()}
+    save_state(state_path, state)
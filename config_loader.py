@@ -1,47 +1,76 @@
 import os
 import toml
 
-# Define the path to the user_input.toml file
-USER_INPUT_PATH = os.path.join(os.getcwd(), "user_input.toml")
+# Parsed configuration, loaded on first use so importing this module has no side effects.
+_config = None
 
-# Ensure the file exists, If the file does not exist, raise an error to prevent further execution.
-if not os.path.exists(USER_INPUT_PATH):
-    raise FileNotFoundError(f"user_input.toml not found in {os.getcwd()}")
 
-# Load the configuration once
-config = toml.load(USER_INPUT_PATH)
+# Returns the path of the user_input.toml file, GENAI_PERF_CONFIG points a run at a different TOML.
+def get_user_input_path():
+    return os.environ.get("GENAI_PERF_CONFIG") or os.path.join(os.getcwd(), "user_input.toml")
 
-# Returns the loaded configuration dictionary.
+
+# Returns the loaded configuration dictionary, reading the TOML file on the first call.
 def load_config():
-   
-    return config
+    global _config
+    if _config is None:
+        user_input_path = get_user_input_path()
+
+        # Ensure the file exists, If the file does not exist, raise an error to prevent further execution.
+        if not os.path.exists(user_input_path):
+            raise FileNotFoundError(f"user_input.toml not found: {user_input_path}")
+
+        _config = toml.load(user_input_path)
+    return _config
+
+
+# Drops the cached configuration so the next load_config() re-reads the TOML file.
+def reload_config():
+    global _config
+    _config = None
+    return load_config()
+
+
+# Writes a single value into the TOML file and the cached configuration.
+def update_config_value(section, key, value):
+    config = load_config()
+    config.setdefault(section, {})[key] = value
+    with open(get_user_input_path(), "w") as f:
+        toml.dump(config, f)
+
+
+# Returns the Kubernetes namespace from the [constants] section.
+def get_namespace():
+    return load_config()["constants"]["namespace"]
+
 
 # Retrieves the profile list, yaml path configuration from the TOML file.
 def load_profile_list_config():
-  
-    profile_cfg = config.get("profile_list", {})
+
+    profile_cfg = load_config().get("profile_list", {})
     yaml_path = profile_cfg.get("yaml_path")
 
     if not yaml_path or not os.path.isfile(yaml_path):
         raise FileNotFoundError(f"YAML path not found or invalid in TOML: {yaml_path}")
-    
+
     return yaml_path
 
 #  Retrieves the profile configuration from the TOML file and Returns the metadata_name and pattern.
 def load_profile_config():
-   
-    profile = config.get("profile", {})
+
+    profile = load_config().get("profile", {})
     metadata_name = profile.get("metadata_name")
     pattern = profile.get("pattern")
-    
+
     if not metadata_name or not pattern:
         raise ValueError("Both 'metadata_name' and 'pattern' must be set in [profile] section of the TOML.")
-    
+
     return metadata_name, pattern
 
 # Returns the download YAML path, image, and selected model ID.
 def load_toml_config():
-   
+
+    config = load_config()
     download_yaml = config["download"]["download_yaml"]
     image = config["profile"]["image"]
     selected_model_id = config["profile"]["selected_model_id"]
@@ -49,7 +78,8 @@ def load_toml_config():
 
 #  Reads runtime and deploy paths from the TOML file & Returns the runtime path and deploy path.
 def read_paths_from_toml():
-   
+
+    config = load_config()
     runtime_path = config["paths"].get("runtime")
     deploy_path = config["paths"].get("deploy")
-    return runtime_path, deploy_path
\ No newline at end of file
+    return runtime_path, deploy_path
@@ -0,0 +1,130 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import toml
+
+from results_parser import collect_results, write_results_csv
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_KUBECONFIG = "/etc/kubernetes/admin.conf"
+
+
+# Writes a self-contained kubeconfig holding only the given context, so each cluster run is isolated.
+def export_context_kubeconfig(context, kubeconfig_path):
+    env = dict(os.environ)
+    env.setdefault("KUBECONFIG", DEFAULT_KUBECONFIG)
+    result = subprocess.run(
+        ["kubectl", "config", "view", "--minify", "--flatten", "--context", context],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to export kubeconfig for context '{context}':\n{result.stderr}")
+    with open(kubeconfig_path, "w") as f:
+        f.write(result.stdout)
+    os.chmod(kubeconfig_path, 0o600)
+
+
+# Prepares the per-cluster working directory: kubeconfig, TOML copy and artifacts destination.
+def prepare_cluster_workdir(context, base_config, run_dir):
+    workdir = os.path.join(run_dir, context)
+    os.makedirs(workdir, exist_ok=True)
+
+    kubeconfig_path = os.path.join(workdir, "kubeconfig")
+    export_context_kubeconfig(context, kubeconfig_path)
+
+    # Each cluster gets its own TOML because the pipeline writes selected_model_id and cluster_ip back into it
+    cluster_config = toml.loads(toml.dumps(base_config))
+    cluster_config.setdefault("paths", {})["destination_path"] = os.path.join(workdir, "artifacts")
+    cluster_config.setdefault("results", {})["cluster"] = context
+    cluster_config.pop("values", None)
+
+    toml_path = os.path.join(workdir, "user_input.toml")
+    with open(toml_path, "w") as f:
+        toml.dump(cluster_config, f)
+    return {"context": context, "workdir": workdir, "kubeconfig": kubeconfig_path, "toml_path": toml_path,
+            "destination_path": cluster_config["paths"]["destination_path"]}
+
+
+# Runs the full pipeline against one cluster and returns its exit code.
+def run_cluster_pipeline(cluster, extra_args=()):
+    log_path = os.path.join(cluster["workdir"], "run.log")
+    # GENAI_PERF_LOG keeps the pipeline log in the cluster's own directory instead of the shared logs folder
+    env = dict(os.environ, KUBECONFIG=cluster["kubeconfig"], GENAI_PERF_CONFIG=cluster["toml_path"],
+               GENAI_PERF_LOG=log_path)
+    cmd = [sys.executable, os.path.join(REPO_DIR, "main.py")] + list(extra_args)
+
+    print(f" [{cluster['context']}] Starting pipeline, output in {log_path}")
+    start = time.time()
+    with open(log_path, "a") as log_file:
+        returncode = subprocess.call(cmd, cwd=REPO_DIR, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+    print(f" [{cluster['context']}] Pipeline finished with exit code {returncode} after {time.time() - start:.0f}s")
+    return returncode
+
+
+# Prints the merged rows as a compact table labeled by cluster.
+def print_results_table(rows):
+    header = f"{'Cluster':<20} {'Use Case':<16} {'Conc':>6} {'Tok/s':>10} {'TTFT p90':>10} {'ITL p90':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        def fmt(value, width, digits):
+            return f"{value:>{width}.{digits}f}" if isinstance(value, (int, float)) else f"{'n/a':>{width}}"
+        print(f"{row['cluster']:<20} {row['use_case']:<16} {row['concurrency']:>6} "
+              f"{fmt(row['output_token_throughput'], 10, 1)} {fmt(row['ttft_p90'], 10, 1)} {fmt(row['itl_p90'], 9, 2)}")
+
+
+# Runs the pipeline on every context at the same time and merges the results into one table.
+def run_fanout(contexts, config_path, output_dir="fanout_runs", extra_args=()):
+    if not contexts:
+        raise ValueError("At least one kubeconfig context is required for a fan-out run.")
+
+    base_config = toml.load(config_path)
+    run_dir = os.path.abspath(os.path.join(output_dir, time.strftime("%Y%m%d_%H%M%S")))
+    os.makedirs(run_dir, exist_ok=True)
+
+    clusters = [prepare_cluster_workdir(context, base_config, run_dir) for context in contexts]
+
+    with ThreadPoolExecutor(max_workers=len(clusters)) as pool:
+        returncodes = list(pool.map(lambda c: run_cluster_pipeline(c, extra_args), clusters))
+
+    merged = []
+    for cluster, returncode in zip(clusters, returncodes):
+        rows = collect_results(cluster["destination_path"]) if os.path.isdir(cluster["destination_path"]) else []
+        if returncode != 0:
+            print(f" [{cluster['context']}] Pipeline failed, {len(rows)} result(s) collected before the failure.")
+        for row in rows:
+            row["cluster"] = cluster["context"]
+        merged.extend(rows)
+
+    merged.sort(key=lambda r: (r["use_case"], r["concurrency"], r["cluster"]))
+    csv_path = os.path.join(run_dir, "fanout-results.csv")
+    write_results_csv(merged, csv_path, extra_columns=[("cluster", "Cluster")])
+    print_results_table(merged)
+
+    failed = [c["context"] for c, rc in zip(clusters, returncodes) if rc != 0]
+    return csv_path, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one benchmark configuration on several clusters at once.")
+    parser.add_argument("--contexts", help="Comma-separated kubeconfig contexts, defaults to [fanout] contexts in the TOML.")
+    parser.add_argument("--config", default=os.environ.get("GENAI_PERF_CONFIG") or os.path.join(os.getcwd(), "user_input.toml"))
+    parser.add_argument("--output-dir", default="fanout_runs")
+    args = parser.parse_args()
+
+    contexts = args.contexts.split(",") if args.contexts else toml.load(args.config).get("fanout", {}).get("contexts", [])
+    _, failed = run_fanout([c.strip() for c in contexts if c.strip()], args.config, args.output_dir)
+    if failed:
+        print(f" Fan-out failed on: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
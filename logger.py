@@ -37,21 +37,10 @@ import sys
 import os
 import time
 
-# Create a logs folder if it doesn't exist
 LOGS_FOLDER = "logs"
-os.makedirs(LOGS_FOLDER, exist_ok=True)
 
-# Generate a unique identifier for the log file (e.g., timestamp + PID)
-unique_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
-
-# Configure the logging settings
-log_file_path = os.path.join(LOGS_FOLDER, f"script_output_{unique_id}.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - PID:%(process)d - %(levelname)s - %(message)s',  # Include PID in log format
-    filename=log_file_path,  # Log messages will be written to a unique file
-    filemode='a'  # Append log messages to the file
-)
+# Path of the active log file, set by setup_logging()
+log_file_path = None
 
 class StreamToLogger:
     def __init__(self, level):
@@ -69,6 +58,37 @@ class StreamToLogger:
         pass
 
 
-# Redirect stdout and stderr to the logger
-sys.stdout = StreamToLogger(logging.INFO)
-sys.stderr = StreamToLogger(logging.ERROR)
\ No newline at end of file
+# Environment variable a parent process (scheduler, fan-out) sets to choose the log file of the run.
+LOG_PATH_ENV = "GENAI_PERF_LOG"
+
+
+# Creates the log file and redirects stdout and stderr to it. Safe to call more than once.
+# The file is GENAI_PERF_LOG when set, otherwise a new file in the logs folder.
+def setup_logging():
+    global log_file_path
+    if log_file_path:
+        return log_file_path
+
+    log_file_path = os.environ.get(LOG_PATH_ENV)
+    if log_file_path:
+        os.makedirs(os.path.dirname(os.path.abspath(log_file_path)), exist_ok=True)
+    else:
+        # Create a logs folder if it doesn't exist
+        os.makedirs(LOGS_FOLDER, exist_ok=True)
+
+        # Generate a unique identifier for the log file (e.g., timestamp + PID)
+        unique_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        log_file_path = os.path.join(LOGS_FOLDER, f"script_output_{unique_id}.log")
+
+    # Configure the logging settings
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - PID:%(process)d - %(levelname)s - %(message)s',  # Include PID in log format
+        filename=log_file_path,  # Log messages will be written to a unique file
+        filemode='a'  # Append log messages to the file
+    )
+
+    # Redirect stdout and stderr to the logger
+    sys.stdout = StreamToLogger(logging.INFO)
+    sys.stderr = StreamToLogger(logging.ERROR)
+    return log_file_path
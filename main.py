@@ -1,100 +1,97 @@
+import argparse
 import base64
 import os
-from pathlib import Path
 import subprocess
-import toml
-import sys
-from logger import StreamToLogger 
-from api_keys import export_env_vars
-from config_loader import load_profile_list_config, load_profile_config, read_paths_from_toml, USER_INPUT_PATH
-from pod_manager import create_pod, wait_for_pod_completion, fetch_profile_pod_logs_and_update_toml, delete_temp_pod_from_yaml, exec_into_genai_perf_pod
-from pvc_manager import update_pvc_yaml, create_and_check_pvc
-from runtime_manager import update_runtime_yaml, apply_runtime_yaml, wait_for_clusterservingruntime, update_runtime_in_deploy_yaml, create_or_apply_deploy_yaml
-from toml_updater import update_cluster_ip_in_toml
-from utils import run_download_flow, genai_pod_yaml, run_bench_script_from_pod, copy_artifacts_from_pod_using_toml
-from config_loader import load_config
-# import config_loader
-
-config = load_config() 
-NAMESPACE = config["constants"]["namespace"]
-
-def main():
+from config_loader import load_config, get_namespace, get_user_input_path
+# Stage modules are imported inside the stage functions so that running a single stage
+# (or just listing them) does not pay for importing yaml, numpy or sqlite3.
 
-    print(" TOML Test Scheduler Started!\n")
-   
 
-    api_keys = config.get("api_keys", {})
-   
-    print(" Exporting API keys as environment variables...")
-    ngc_api_key, ngc_token, hf_token = export_env_vars(api_keys)
+# Set once the API keys have been exported (and echoed) for this process.
+_api_keys_exported = False
+
+
+# Defaults KUBECONFIG before the first kubectl call of a run. The API keys are exported by load_api_keys.
+def export_environment():
+    from api_keys import DEFAULT_KUBECONFIG
+
+    os.environ.setdefault("KUBECONFIG", DEFAULT_KUBECONFIG)
+
+
+# Exports the API keys from the TOML once per process and returns the NGC API key and Hugging Face token.
+# Later calls (secret validation on --resume, the --reuse check) read the keys without echoing them again.
+def load_api_keys():
+    global _api_keys_exported
+    api_keys = load_config().get("api_keys", {})
+    if not _api_keys_exported:
+        from api_keys import export_env_vars
+
+        print(" Exporting API keys as environment variables...")
+        export_env_vars(api_keys)
+        _api_keys_exported = True
 
+    ngc_api_key, hf_token = api_keys.get("ngc_api_key"), api_keys.get("hugging_face_token")
     if not ngc_api_key:
         raise ValueError(" Missing 'ngc_api_key' in [api_keys]")
     if not hf_token:
         raise ValueError(" Missing 'hugging_face_token' in [api_keys]")
+    return ngc_api_key, hf_token
 
-    print(f" Checking if namespace '{NAMESPACE}' exists...")
-    ns_check = subprocess.run( ["kubectl", "get", "ns", NAMESPACE], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
+# Recreates 'ngc-secret' and 'nvidia-nim-secrets' with the current keys and stamps their hash.
+def create_secrets(namespace, ngc_api_key, hf_token):
+    from reuse_manager import compute_secret_hash, annotate_secrets
 
-    if ns_check.returncode != 0:
-     print(f" Creating Kubernetes namespace '{NAMESPACE}'...")
-     subprocess.run(["kubectl", "create", "ns", NAMESPACE], check=True)
-    else:
-     print(f" Namespace '{NAMESPACE}' already exists. Skipping creation.")
-
-
-
-    print(f"Checking if Docker registry secret 'ngc-secret' exists in namespace '{NAMESPACE}'...")
+    print(f"Checking if Docker registry secret 'ngc-secret' exists in namespace '{namespace}'...")
     secret_check = subprocess.run(
-    ["kubectl", "get", "secret", "ngc-secret", "-n", NAMESPACE],
+    ["kubectl", "get", "secret", "ngc-secret", "-n", namespace],
     stdout=subprocess.DEVNULL,
     stderr=subprocess.DEVNULL
 )
 
     if secret_check.returncode == 0:
       print("Deleting existing 'ngc-secret' to update it with new key...")
-      subprocess.run(["kubectl", "delete", "secret", "ngc-secret", "-n", NAMESPACE], check=True)
+      subprocess.run(["kubectl", "delete", "secret", "ngc-secret", "-n", namespace], check=True)
 
     print("Creating Docker registry secret 'ngc-secret'...")
     subprocess.run([
     "kubectl", "create", "secret", "docker-registry", "ngc-secret",
-    "-n", NAMESPACE,
+    "-n", namespace,
     "--docker-server=nvcr.io",
     "--docker-username", "oauthtoken",
     "--docker-password", ngc_api_key
 ], check=True)
 
-     
-    print(f" Checking if secret 'nvidia-nim-secrets' exists in namespace '{NAMESPACE}'...")
+
+    print(f" Checking if secret 'nvidia-nim-secrets' exists in namespace '{namespace}'...")
     nim_secret_check = subprocess.run(
-        ["kubectl", "get", "secret", "nvidia-nim-secrets", "-n", NAMESPACE],
+        ["kubectl", "get", "secret", "nvidia-nim-secrets", "-n", namespace],
         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
     )
 
     if nim_secret_check.returncode == 0:
         print(" Secret 'nvidia-nim-secrets' already exists. Deleting it to recreate...")
-        subprocess.run(["kubectl", "delete", "secret", "nvidia-nim-secrets", "-n", NAMESPACE], check=True)
+        subprocess.run(["kubectl", "delete", "secret", "nvidia-nim-secrets", "-n", namespace], check=True)
     else:
         print(" 'nvidia-nim-secrets' does not exist. Proceeding to create it...")
 
     print(" Creating Kubernetes secret 'nvidia-nim-secrets'...")
     subprocess.run([
         "kubectl", "create", "secret", "generic", "nvidia-nim-secrets",
-        "-n", NAMESPACE,
+        "-n", namespace,
         f"--from-literal=token={hf_token}",
         f"--from-literal=api-key={ngc_api_key}"
     ], check=True)
-   
-    nim_secrets_yaml_path = config["paths"]["nim_secrets_yaml_path"]
+
+    nim_secrets_yaml_path = load_config()["paths"]["nim_secrets_yaml_path"]
     if not os.path.exists(nim_secrets_yaml_path):
      raise FileNotFoundError(f"YAML secret template not found: {nim_secrets_yaml_path}")
-  
+
     print(" Encoding HF_TOKEN and NGC_API_KEY as base64...")
     hf_token_b64 = base64.b64encode(hf_token.encode()).decode()
     ngc_api_key_b64 = base64.b64encode(ngc_api_key.encode()).decode()
 
- 
+
     print(f" Reading YAML secret template from: {nim_secrets_yaml_path}")
     with open(nim_secrets_yaml_path, "r") as f:
         yaml_content = f.read()
@@ -103,76 +100,466 @@ def main():
     yaml_content = yaml_content.replace("${HF_TOKEN}", hf_token_b64)
     yaml_content = yaml_content.replace("${NGC_API_KEY}", ngc_api_key_b64)
 
-  
-    print(f" Applying updated secret YAML to namespace '{NAMESPACE}'...")
+
+    print(f" Applying updated secret YAML to namespace '{namespace}'...")
     subprocess.run(
-        ["kubectl", "apply", "-n", NAMESPACE, "-f", "-"], input=yaml_content, universal_newlines=True, check=True)
-    print(f" Successfully applied secret to Kubernetes namespace '{NAMESPACE}'\n")
+        ["kubectl", "apply", "-n", namespace, "-f", "-"], input=yaml_content, universal_newlines=True, check=True)
+    print(f" Successfully applied secret to Kubernetes namespace '{namespace}'\n")
+
+    annotate_secrets(namespace, compute_secret_hash(ngc_api_key, hf_token))
+
+
+# Returns the genai-perf pod recorded by an earlier stage, or looks it up in the namespace.
+def resolve_target_pod(ctx):
+    from pod_manager import find_genai_perf_pod
+
+    target_pod = ctx.get("target_pod") or find_genai_perf_pod(ctx["namespace"])
+    if not target_pod:
+         raise ValueError("No pod matching 'genai-perf' found.")
+    return target_pod
+
+
+# Stage: ensures the namespace exists.
+def stage_namespace(ctx):
+    namespace = ctx["namespace"]
+    print(f" Checking if namespace '{namespace}' exists...")
+    ns_check = subprocess.run( ["kubectl", "get", "ns", namespace], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+    if ns_check.returncode != 0:
+     print(f" Creating Kubernetes namespace '{namespace}'...")
+     subprocess.run(["kubectl", "create", "ns", namespace], check=True)
+    else:
+     print(f" Namespace '{namespace}' already exists. Skipping creation.")
+    return {}
+
+
+# Stage: creates the secrets and labels the namespace.
+def stage_secrets(ctx):
+    namespace = ctx["namespace"]
+    ngc_api_key, hf_token = load_api_keys()
+    create_secrets(namespace, ngc_api_key, hf_token)
 
     result_label = subprocess.run(
-    ["kubectl", "get", "ns", NAMESPACE, "--show-labels"],stdout=subprocess.PIPE,stderr=subprocess.PIPE,universal_newlines=True)
+    ["kubectl", "get", "ns", namespace, "--show-labels"],stdout=subprocess.PIPE,stderr=subprocess.PIPE,universal_newlines=True)
     print(result_label.stdout)
 
-    print(f" Labeling namespace '{NAMESPACE}'...")
-    subprocess.run(["kubectl", "label", "ns", NAMESPACE, "hpe-ezua/ezmodels=true", "--overwrite"], check=True)
+    print(f" Labeling namespace '{namespace}'...")
+    subprocess.run(["kubectl", "label", "ns", namespace, "hpe-ezua/ezmodels=true", "--overwrite"], check=True)
+    return {}
 
-    pvc_config = config.get('pvc_details', {})
-    update_pvc_yaml(pvc_config)
 
-   
+# Stage: applies the model cache PVC.
+def stage_pvc(ctx):
+    from pvc_manager import apply_pvc_yaml
+
+    apply_pvc_yaml(load_config().get('pvc_details', {}), ctx["namespace"])
+    return {}
+
+
+# Stage: runs the list-profiles pod and stores the selected profile in the TOML, probing every
+# matching profile first when auto-tune is enabled.
+def stage_profile(ctx):
+    from config_loader import load_profile_config, load_profile_list_config
+    from pod_manager import create_pod, fetch_profile_pod_logs_and_update_toml
+
     print(" Starting pod creation and monitoring process...")
 
     pod_prefix, pattern = load_profile_config()
 
     yaml_path = load_profile_list_config()
 
-    create_pod(yaml_path, NAMESPACE)
+    create_pod(yaml_path, ctx["namespace"])
 
     print(f" Using pod prefix: {pod_prefix}  and pattern: {pattern}")
 
-    fetch_profile_pod_logs_and_update_toml(NAMESPACE)
- 
-    run_download_flow(USER_INPUT_PATH, NAMESPACE)
+    if ctx.get("autotune") or load_config().get("autotune", {}).get("enabled", False):
+        from autotune import autotune_profile
+
+        # The probe runs from the genai-perf pod, so bring it up ahead of its own stage
+        autotune_profile(ctx["namespace"], stage_genai_pod(ctx)["target_pod"])
+    else:
+        fetch_profile_pod_logs_and_update_toml(ctx["namespace"])
+    return {"profile_yaml_path": yaml_path, "selected_model_id": load_config()["profile"]["selected_model_id"]}
+
+
+# Stage: creates the model download job for the selected profile.
+def stage_download(ctx):
+    from utils import run_download_flow
+
+    run_download_flow(get_user_input_path(), ctx["namespace"])
+    return {}
+
+
+# Stage: applies the ClusterServingRuntime and waits for it.
+def stage_runtime(ctx):
+    from runtime_manager import apply_runtime_yaml, render_deployment_manifests, wait_for_clusterservingruntime
+
+    runtime_manifest, _ = render_deployment_manifests()
+    apply_runtime_yaml(runtime_manifest, ctx["namespace"])
+    wait_for_clusterservingruntime(ctx["namespace"])
+    return {}
+
+
+# Stage: applies the InferenceService and records its cluster IP.
+def stage_deploy(ctx):
+    from runtime_manager import create_or_apply_deploy_yaml, render_deployment_manifests
+    from toml_updater import update_cluster_ip_in_toml
+
+    _, deploy_manifest = render_deployment_manifests()
+    create_or_apply_deploy_yaml(deploy_manifest, ctx["namespace"])
+
+    cluster_ip = update_cluster_ip_in_toml(ctx["namespace"])
+    return {"cluster_ip": cluster_ip}
+
+
+# Stage: creates the workdir PVC and the genai-perf pod and prepares it for benchmarking.
+def stage_genai_pod(ctx):
+    from pod_manager import exec_into_genai_perf_pod
+    from pvc_manager import create_and_check_pvc
+    from utils import genai_pod_yaml
+
+    namespace = ctx["namespace"]
+    create_and_check_pvc(get_user_input_path(), namespace)
+
+    genai_pod_yaml(get_user_input_path(), namespace)
+
+    # Kept in ctx but not in the checkpoint: a resumed run copies bench.sh again in case the pod was restarted
+    ctx["pod_prepared"] = exec_into_genai_perf_pod(namespace)
+    return {"target_pod": resolve_target_pod(ctx)}
+
+
+# Stage: runs bench.sh inside the genai-perf pod, copying it there first when the genai-pod stage did not
+# run in this process (--reuse, --resume or a single stage).
+def stage_bench(ctx):
+    from pod_manager import prepare_genai_perf_pod
+    from utils import run_bench_script_from_pod
+
+    target_pod = resolve_target_pod(ctx)
+    if not ctx.get("pod_prepared"):
+        prepare_genai_perf_pod(ctx["namespace"], target_pod)
+    run_id = run_bench_script_from_pod(get_user_input_path(), target_pod, ctx["namespace"], stream=ctx.get("stream", False))
+    return {"target_pod": target_pod, "run_id": run_id}
+
+
+# Stage: copies the artifacts, records the run and builds the capacity report.
+def stage_collect(ctx):
+    from utils import copy_artifacts_from_pod_using_toml
+
+    target_pod = resolve_target_pod(ctx)
+    copy_artifacts_from_pod_using_toml(ctx["namespace"],target_pod)
+    record_results(ctx.get("run_id"))
+    return {}
+
+
+# Stage: deletes the temporary list-profiles pod.
+def stage_cleanup(ctx):
+    from config_loader import load_profile_list_config
+    from pod_manager import delete_temp_pod_from_yaml
+
+    delete_temp_pod_from_yaml(ctx.get("profile_yaml_path") or load_profile_list_config(), ctx["namespace"])
+    return {}
+
+
+# Live checks used by --resume: each returns True when a saved stage's outputs still hold on the cluster.
+def validate_namespace(ctx, outputs):
+    return subprocess.run(["kubectl", "get", "ns", ctx["namespace"]],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+
+def validate_secrets(ctx, outputs):
+    from reuse_manager import compute_secret_hash, secrets_match
+
+    ngc_api_key, hf_token = load_api_keys()
+    return secrets_match(ctx["namespace"], compute_secret_hash(ngc_api_key, hf_token))
+
+
+def validate_pvc(ctx, outputs):
+    from manifest_renderer import manifest_name, render_manifest
+    from reuse_manager import kubectl_get_json
+
+    pvc_name = manifest_name(render_manifest(load_config()["pvc_details"]["pvc_yaml_path"]))
+    return kubectl_get_json(["pvc", pvc_name, "-n", ctx["namespace"]]) is not None
+
+
+def validate_profile(ctx, outputs):
+    selected_model_id = outputs.get("selected_model_id")
+    return bool(selected_model_id) and selected_model_id == load_config()["profile"].get("selected_model_id")
+
+
+def validate_download(ctx, outputs):
+    from config_loader import load_toml_config
+    from manifest_renderer import manifest_name, render_manifest
+    from reuse_manager import kubectl_get_json
+
+    download_yaml, _, _ = load_toml_config()
+    job = kubectl_get_json(["job", manifest_name(render_manifest(download_yaml)), "-n", ctx["namespace"]])
+    return job is not None and not job.get("status", {}).get("failed")
+
+
+def validate_runtime(ctx, outputs):
+    from reuse_manager import runtime_matches
+    from runtime_manager import render_deployment_manifests
+
+    runtime_manifest, _ = render_deployment_manifests()
+    return runtime_matches(runtime_manifest)
+
+
+def validate_deploy(ctx, outputs):
+    from manifest_renderer import manifest_name
+    from reuse_manager import inference_service_ready, served_model_matches
+    from runtime_manager import render_deployment_manifests
 
     data = load_config()
+    cluster_ip = outputs.get("cluster_ip")
+    if not cluster_ip or cluster_ip != data.get("values", {}).get("cluster_ip"):
+        return False
+    _, deploy_manifest = render_deployment_manifests()
+    return (inference_service_ready(ctx["namespace"], manifest_name(deploy_manifest))
+            and served_model_matches(cluster_ip, data["final_exec"]["model"]))
+
+
+def validate_genai_pod(ctx, outputs):
+    from reuse_manager import kubectl_get_json
+
+    pod = kubectl_get_json(["pod", outputs.get("target_pod", ""), "-n", ctx["namespace"]])
+    return pod is not None and pod.get("status", {}).get("phase") == "Running"
+
+
+def validate_bench(ctx, outputs):
+    run_id = outputs.get("run_id")
+    if not run_id or not validate_genai_pod(ctx, outputs):
+        return False
+    pod_artifacts_path = load_config()["paths"]["pod_artifacts_path"]
+    result = subprocess.run(
+        ["kubectl", "exec", "-n", ctx["namespace"], outputs["target_pod"], "--",
+         "find", pod_artifacts_path, "-name", f"{run_id}_*_genai_perf.json"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True
+    )
+    return result.returncode == 0 and bool(result.stdout.strip())
 
-    runtime_yaml = data["paths"]["runtime"]
-    image = data["profile"]["image"]
-    selected_model_id = data["profile"]["selected_model_id"]
-
-    update_runtime_yaml(runtime_yaml, image, selected_model_id)
-    apply_runtime_yaml(runtime_yaml, NAMESPACE)
-    wait_for_clusterservingruntime(NAMESPACE)   
-
-    runtime_yaml, deploy_yaml = read_paths_from_toml()
-
-    runtime_path = Path(config["paths"]["runtime"])
-
-    runtime_name = runtime_path.stem 
-   
-    update_runtime_in_deploy_yaml(deploy_yaml, runtime_name)
-   
-    deploy_yaml_path = config["paths"].get("deploy")
-    
-    create_or_apply_deploy_yaml(deploy_yaml_path, NAMESPACE)
-    get_pods = subprocess.run(
-            ["kubectl", "get", "pods", "-n",NAMESPACE, "-o", "jsonpath={.items[*].metadata.name}"],
-            universal_newlines=True,check=True,stdout=subprocess.PIPE,stderr=subprocess.PIPE,)
-    pods = get_pods.stdout.strip().split()
-    target_pod = next((pod for pod in pods if pod.startswith("genai-perf")), None)
-    if not target_pod:
-         raise ValueError("No pod matching 'genai-perf' found.")
-    update_cluster_ip_in_toml(NAMESPACE, USER_INPUT_PATH)  
 
-    create_and_check_pvc(USER_INPUT_PATH, NAMESPACE)  
+def validate_collect(ctx, outputs):
+    from results_parser import collect_results
+
+    destination_path = load_config()["paths"]["destination_path"]
+    return bool(ctx.get("run_id")) and bool(collect_results(destination_path, export_file_name=ctx["run_id"]))
+
+
+def validate_cleanup(ctx, outputs):
+    return True
+
 
-    genai_pod_yaml(USER_INPUT_PATH, NAMESPACE)
+# Pipeline stages in execution order, with the check that lets --resume skip them.
+STAGES = [
+    ("namespace", stage_namespace, validate_namespace),
+    ("secrets", stage_secrets, validate_secrets),
+    ("pvc", stage_pvc, validate_pvc),
+    ("profile", stage_profile, validate_profile),
+    ("download", stage_download, validate_download),
+    ("runtime", stage_runtime, validate_runtime),
+    ("deploy", stage_deploy, validate_deploy),
+    ("genai-pod", stage_genai_pod, validate_genai_pod),
+    ("bench", stage_bench, validate_bench),
+    ("collect", stage_collect, validate_collect),
+    ("cleanup", stage_cleanup, validate_cleanup),
+]
+STAGE_NAMES = [name for name, _, _ in STAGES]
 
-    exec_into_genai_perf_pod(NAMESPACE)
+# Stages skipped when --reuse finds a matching deployment.
+DEPLOY_STAGES = ("secrets", "pvc", "profile", "download", "runtime", "deploy", "genai-pod", "cleanup")
+
+
+# Returns True when the live deployment matches the configuration and the genai-perf pod is up.
+def can_reuse_deployment(namespace):
+    from manifest_renderer import manifest_name
+    from pod_manager import find_genai_perf_pod
+    from reuse_manager import compute_secret_hash, deployment_is_reusable
+    from runtime_manager import render_deployment_manifests
+
+    ngc_api_key, hf_token = load_api_keys()
+    runtime_manifest, deploy_manifest = render_deployment_manifests()
+    data = load_config()
+    cluster_ip = data.get("values", {}).get("cluster_ip")
+    model = data["final_exec"]["model"]
+
+    if not deployment_is_reusable(namespace, compute_secret_hash(ngc_api_key, hf_token),
+                                  runtime_manifest, manifest_name(deploy_manifest), cluster_ip, model):
+        return False
+    if not find_genai_perf_pod(namespace):
+        print(" No 'genai-perf' pod found. Running the full deployment.")
+        return False
+    return True
+
+
+# Records the run metadata next to the copied artifacts and ingests the new results into the results database.
+def record_results(run_id):
+    from results_store import DEFAULT_DB_PATH, ingest, write_run_metadata
+
+    data = load_config()
+    destination_path = data["paths"]["destination_path"]
+    db_path = data.get("results", {}).get("db_path", DEFAULT_DB_PATH)
+
+    if run_id:
+        write_run_metadata(destination_path, run_id, data)
+    try:
+        ingest(destination_path, db_path)
+    except Exception as e:
+        print(f" Failed to ingest results into {db_path}: {e}")
+
+    if "capacity" in data and run_id:
+        from capacity_planner import write_capacity_report
+        write_capacity_report(destination_path, run_id, data)
+
+
+# Reruns the [scaling] sweep subset across InferenceService replica counts against the deployed NIM.
+def run_scaling(namespace=None):
+    from manifest_renderer import manifest_name
+    from pod_manager import prepare_genai_perf_pod
+    from runtime_manager import render_deployment_manifests
+    from scaling_manager import run_scaling_sweep
+
+    namespace = namespace or get_namespace()
+    _, deploy_manifest = render_deployment_manifests()
+    target_pod = resolve_target_pod({"namespace": namespace})
+    prepare_genai_perf_pod(namespace, target_pod)
+    return run_scaling_sweep(namespace, manifest_name(deploy_manifest), target_pod)
+
+
+# Replays the [workload] trace or weighted mix against the deployed NIM and reports latency per request class.
+def run_workload(namespace=None):
+    from pod_manager import prepare_genai_perf_pod
+    from workload import run_workload as replay_workload
+
+    namespace = namespace or get_namespace()
+    target_pod = resolve_target_pod({"namespace": namespace})
+    # The pod may still hold a bench.sh older than --input-file
+    prepare_genai_perf_pod(namespace, target_pod)
+    return replay_workload(namespace, target_pod)
+
+
+# Returns the stage names from first_stage to last_stage, both included.
+def select_stages(first_stage=None, last_stage=None):
+    start = STAGE_NAMES.index(first_stage) if first_stage else 0
+    end = STAGE_NAMES.index(last_stage) if last_stage else len(STAGE_NAMES) - 1
+    if start > end:
+        raise ValueError(f"Stage '{first_stage}' comes after '{last_stage}'.")
+    return STAGE_NAMES[start:end + 1]
+
+
+# Skips the leading stages whose saved outputs still validate against the live cluster.
+def resume_from_state(stage_names, ctx, state):
+    validators = {name: validate for name, _, validate in STAGES}
+    for index, name in enumerate(stage_names):
+        saved = state["stages"].get(name)
+        if saved is None:
+            print(f" Resuming at stage '{name}': no checkpoint recorded.")
+            return stage_names[index:], ctx
+
+        candidate = dict(ctx, **saved["outputs"])
+        try:
+            valid = validators[name](candidate, saved["outputs"])
+        except Exception as e:
+            print(f" Could not validate stage '{name}': {e}")
+            valid = False
+        if not valid:
+            print(f" Resuming at stage '{name}': checkpoint no longer matches the cluster.")
+            return stage_names[index:], ctx
+
+        print(f" Stage '{name}' is complete, skipping.")
+        ctx = candidate
+    return [], ctx
+
+
+# Seeds ctx with the outputs recorded by every stage before the first selected one,
+# e.g. the run ID that a lone 'collect' needs from 'bench'. Values already in ctx win.
+def seed_from_state(stage_names, ctx, state):
+    seeded = {}
+    for name in STAGE_NAMES[:STAGE_NAMES.index(stage_names[0])]:
+        saved = state["stages"].get(name)
+        if saved is not None:
+            seeded.update(saved["outputs"])
+    return dict(seeded, **ctx)
+
+
+# Runs the selected stages in order, passing each stage's outputs on to the next ones
+# and checkpointing them to the state file after every stage.
+def run_stages(stage_names, ctx=None, reuse=False, resume=False):
+    from checkpoint import config_fingerprint, get_state_path, load_state, record_stage
+
+    ctx = dict(ctx or {})
+    ctx.setdefault("namespace", get_namespace())
+    stage_functions = {name: run for name, run, _ in STAGES}
+
+    state_path = get_state_path(ctx["namespace"])
+    state = load_state(state_path, config_fingerprint(load_config()))
+    if stage_names:
+        ctx = seed_from_state(stage_names, ctx, state)
+
+    if reuse and any(name in DEPLOY_STAGES for name in stage_names) and can_reuse_deployment(ctx["namespace"]):
+        print(" Reusing the existing deployment. Skipping straight to benchmarking...")
+        stage_names = [name for name in stage_names if name not in DEPLOY_STAGES]
+
+    if resume:
+        stage_names, ctx = resume_from_state(stage_names, ctx, state)
+
+    for name in stage_names:
+        print(f"\n ===== Stage: {name} =====")
+        outputs = stage_functions[name](ctx) or {}
+        ctx.update(outputs)
+        record_stage(state_path, state, STAGE_NAMES, name, outputs)
+    return ctx
+
+
+def main(reuse=False, first_stage=None, last_stage=None, resume=False, stream=False, autotune=False):
+
+    print(" TOML Test Scheduler Started!\n")
+    export_environment()
+
+    return run_stages(select_stages(first_stage, last_stage), {"stream": stream, "autotune": autotune}, reuse=reuse, resume=resume)
+
+
+# Parses the command line: no stage runs the whole pipeline, a stage name runs only that stage.
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Deploy NIM and run GenAI-Perf benchmarks.")
+    parser.add_argument("stage", nargs="?", default="run", choices=["run", "list", "scale", "workload"] + STAGE_NAMES,
+                        help="'run' (default) runs the pipeline, 'list' prints the stages, 'scale' runs the replica-scaling "
+                             "sweep, 'workload' replays the [workload] trace or mix, a stage name runs only that stage.")
+    parser.add_argument("--from", dest="first_stage", choices=STAGE_NAMES, help="First stage of the run.")
+    parser.add_argument("--to", dest="last_stage", choices=STAGE_NAMES, help="Last stage of the run.")
+    parser.add_argument("--reuse", action="store_true",
+                        help="Skip deployment when the live NIM already matches the configuration.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the first stage whose checkpoint is missing or no longer valid.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Fetch each sweep point's artifact as soon as it completes and keep a live partial results CSV.")
+    parser.add_argument("--autotune", action="store_true",
+                        help="Probe every profile matching the pattern and select the best one under the SLOs.")
+    return parser.parse_args(argv)
+
+
+def cli(argv=None):
+    args = parse_args(argv)
+    if args.stage == "list":
+        print("\n".join(STAGE_NAMES))
+        return
+
+    from logger import setup_logging
+    setup_logging()
+    export_environment()
+
+    if args.stage == "scale":
+        run_scaling()
+    elif args.stage == "workload":
+        run_workload()
+    elif args.stage == "run":
+        main(reuse=args.reuse, first_stage=args.first_stage, last_stage=args.last_stage, resume=args.resume,
+             stream=args.stream, autotune=args.autotune)
+    else:
+        print(f" Running single stage '{args.stage}'")
+        run_stages([args.stage], {"stream": args.stream, "autotune": args.autotune}, reuse=args.reuse,
+                   resume=args.resume)
 
-    run_bench_script_from_pod(USER_INPUT_PATH, target_pod, NAMESPACE)
-    copy_artifacts_from_pod_using_toml(NAMESPACE,target_pod)
-    delete_temp_pod_from_yaml(yaml_path, NAMESPACE)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    cli()
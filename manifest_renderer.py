@@ -0,0 +1,121 @@
+import copy
+import os
+import subprocess
+from collections import namedtuple
+
+import yaml
+
+# Parsed base manifests, keyed by absolute path. Each file is read once per process
+# and only deep copies of the cached object are handed out for rendering.
+_BASE_MANIFESTS = {}
+
+# Typed overlays applied to a copy of a base manifest at render time.
+RuntimeOverlay = namedtuple("RuntimeOverlay", ["image", "selected_model_id"])
+DownloadOverlay = namedtuple("DownloadOverlay", ["image", "selected_model_id"])
+PvcOverlay = namedtuple("PvcOverlay", ["storage_class", "storage_size"])
+DeployOverlay = namedtuple("DeployOverlay", ["runtime_name"])
+
+
+# Loads a base manifest from disk once and caches the parsed object.
+def load_base_manifest(yaml_path):
+    key = os.path.abspath(yaml_path)
+    if key not in _BASE_MANIFESTS:
+        try:
+            with open(key, "r") as f:
+                manifest = yaml.safe_load(f)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Manifest YAML not found: {yaml_path}")
+
+        if manifest is None:
+            raise ValueError(f"Manifest YAML is empty: {yaml_path}")
+        if "spec" not in manifest:
+            raise ValueError(f"Manifest YAML missing 'spec' section: {yaml_path}")
+
+        _BASE_MANIFESTS[key] = manifest
+    return _BASE_MANIFESTS[key]
+
+
+# Drops cached base manifests so the next render re-reads them from disk.
+def clear_manifest_cache():
+    _BASE_MANIFESTS.clear()
+
+
+def _apply_runtime_overlay(manifest, overlay):
+    container = manifest["spec"]["containers"][0]
+    container["image"] = overlay.image
+
+    # Update the environment variable for the model profile
+    for env_var in container.get("env", []):
+        if env_var["name"] == "NIM_MODEL_PROFILE":
+            env_var["value"] = overlay.selected_model_id
+            break
+
+
+def _apply_download_overlay(manifest, overlay):
+    container = manifest["spec"]["template"]["spec"]["containers"][0]
+    container["image"] = overlay.image
+    container["args"] = ["download-to-cache", "--profile", overlay.selected_model_id]
+
+
+def _apply_pvc_overlay(manifest, overlay):
+    manifest["spec"]["storageClassName"] = overlay.storage_class
+    manifest["spec"]["resources"]["requests"]["storage"] = overlay.storage_size
+
+
+def _apply_deploy_overlay(manifest, overlay):
+    manifest["spec"]["predictor"]["model"]["runtime"] = overlay.runtime_name
+
+
+_OVERLAY_APPLIERS = {
+    RuntimeOverlay: _apply_runtime_overlay,
+    DownloadOverlay: _apply_download_overlay,
+    PvcOverlay: _apply_pvc_overlay,
+    DeployOverlay: _apply_deploy_overlay,
+}
+
+
+# Returns a fresh copy of the cached base manifest with the given overlays applied.
+def render_manifest(yaml_path, *overlays):
+    manifest = copy.deepcopy(load_base_manifest(yaml_path))
+    for overlay in overlays:
+        applier = _OVERLAY_APPLIERS.get(type(overlay))
+        if applier is None:
+            raise TypeError(f"Unsupported manifest overlay: {overlay!r}")
+        applier(manifest, overlay)
+    return manifest
+
+
+# Returns the metadata name of a rendered manifest.
+def manifest_name(manifest):
+    return manifest.get("metadata", {}).get("name")
+
+
+# Runs a kubectl verb (create/apply/delete) with the rendered manifest passed on stdin.
+def kubectl_manifest(verb, manifest, namespace, check=False):
+    return subprocess.run(
+        ["kubectl", verb, "-f", "-", "-n", namespace],
+        input=yaml.safe_dump(manifest),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=check
+    )
+
+
+# Creates the rendered manifest, falling back to apply when the object already exists.
+def create_or_apply_manifest(manifest, namespace, kind_label="Resource"):
+    result = kubectl_manifest("create", manifest, namespace)
+    if result.returncode == 0:
+        print(f" {kind_label} created successfully.")
+        return
+
+    if "AlreadyExists" not in result.stderr:
+        print(f" Failed to create {kind_label}:\n{result.stderr}")
+        raise RuntimeError(f"{kind_label} creation failed.")
+
+    print(f" {kind_label} already exists. Applying update instead...")
+    result = kubectl_manifest("apply", manifest, namespace)
+    if result.returncode != 0:
+        print(f" Failed to apply {kind_label}:\n{result.stderr}")
+        raise RuntimeError(f"{kind_label} apply failed.")
+    print(f" Applied update to existing {kind_label}.")
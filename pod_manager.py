@@ -4,12 +4,7 @@ import time
 import os
 import re
 
-import toml
-from config_loader import load_config, load_profile_config, USER_INPUT_PATH   # Import centralized functions
-
-# Load configuration once
-config = load_config()
-NAMESPACE = config["constants"]["namespace"]
+from config_loader import load_config, load_profile_config, update_config_value   # Import centralized functions
 
 # Creates a pod in the specified Kubernetes namespace using the provided YAML file.
 def create_pod(yaml_path, NAMESPACE):
@@ -67,63 +62,75 @@ def wait_for_pod_completion(NAMESPACE, timeout=300):
     raise TimeoutError(f" Timeout: Pod '{metadata_name}' did not complete within {timeout} seconds.")
 
 
-# Fetches logs from the profile pod and updates the TOML file with the selected model ID.
-def fetch_profile_pod_logs_and_update_toml(namespace):
-    try:
-        # Use pattern from the centralized configuration
-        _, pattern = load_profile_config()
-        if not pattern:
-            print(" No pattern found under [profile] in TOML.")
-            return
+# Returns the profile IDs in the profile pod logs whose line matches the [profile] pattern, in log order.
+def list_matching_profiles(namespace):
+    # Use pattern from the centralized configuration
+    _, pattern = load_profile_config()
+    if not pattern:
+        print(" No pattern found under [profile] in TOML.")
+        return []
 
-        print(f"\n Using regex pattern from TOML: '{pattern}'")
-       
-        result = subprocess.run(
-            ["kubectl", "get", "pods", "-n", namespace, "--no-headers"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-            check=True
-        )
+    print(f"\n Using regex pattern from TOML: '{pattern}'")
+   
+    result = subprocess.run(
+        ["kubectl", "get", "pods", "-n", namespace, "--no-headers"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
 
-        pods = result.stdout.strip().split('\n')
-        profile_pod = None
-        for line in pods:
-            pod_name = line.split()[0]
-            if "profile" in pod_name.lower():
-                profile_pod = pod_name
-                break
+    pods = result.stdout.strip().split('\n')
+    profile_pod = None
+    for line in pods:
+        pod_name = line.split()[0]
+        if "profile" in pod_name.lower():
+            profile_pod = pod_name
+            break
 
-        if not profile_pod:
-            print(" No pod found with 'profile' in its name.")
-            return
+    if not profile_pod:
+        print(" No pod found with 'profile' in its name.")
+        return []
 
-        print(f"\n Found profile pod: {profile_pod}")
+    print(f"\n Found profile pod: {profile_pod}")
 
-        logs_result = subprocess.run(
-            ["kubectl", "logs", profile_pod, "-n", namespace],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True
-        )
+    logs_result = subprocess.run(
+        ["kubectl", "logs", profile_pod, "-n", namespace],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
 
-        if logs_result.returncode != 0:
-            print(f" Failed to get logs:\n{logs_result.stderr}")
-            return
-        
-        regex = re.compile(pattern, re.IGNORECASE)
-        matches = [line for line in logs_result.stdout.splitlines() if regex.search(line)]
+    if logs_result.returncode != 0:
+        print(f" Failed to get logs:\n{logs_result.stderr}")
+        return []
+    
+    regex = re.compile(pattern, re.IGNORECASE)
+    matches = [line for line in logs_result.stdout.splitlines() if regex.search(line)]
 
-        print("\n Matching log lines:")
-        for line in matches:
-            print(line)
+    print("\n Matching log lines:")
+    for line in matches:
+        print(line)
 
-        match_id = matches[0].split(":")[0].strip()
-        
-        config["profile"]["selected_model_id"] = match_id
+    profile_ids = []
+    for line in matches:
+        profile_id = line.split(":")[0].strip()
+        if profile_id and profile_id not in profile_ids:
+            profile_ids.append(profile_id)
+    return profile_ids
 
-        with open(USER_INPUT_PATH, "w") as f:
-            toml.dump(config, f)
+
+# Fetches logs from the profile pod and updates the TOML file with the selected model ID.
+def fetch_profile_pod_logs_and_update_toml(namespace):
+    try:
+        profile_ids = list_matching_profiles(namespace)
+        if not profile_ids:
+            print(" No profile matching the pattern found.")
+            return
+
+        match_id = profile_ids[0]
+        
+        update_config_value("profile", "selected_model_id", match_id)
 
         print(f"\nUpdated TOML with selected_model_id = {match_id}")
 
@@ -160,9 +167,8 @@ def delete_temp_pod_from_yaml(yaml_path, NAMESPACE):
     print(confirm.stdout.strip())
 
 
-#  Executes commands inside the 'genai-perf' pod and performs setup tasks.
-def exec_into_genai_perf_pod(namespace):
-    cluster_ip = config.get("cluster", {}).get("ip")
+#  Returns the name of the first pod starting with 'genai-perf', or None.
+def find_genai_perf_pod(namespace):
     get_pods = subprocess.run(
         ["kubectl", "get", "pods", "-n", namespace, "-o", "jsonpath={.items[*].metadata.name}"],
         universal_newlines=True,
@@ -171,16 +177,17 @@ def exec_into_genai_perf_pod(namespace):
         stderr=subprocess.PIPE,
     )
     pods = get_pods.stdout.strip().split()
-    target_pod = next((pod for pod in pods if pod.startswith("genai-perf")), None)
+    return next((pod for pod in pods if pod.startswith("genai-perf")), None)
 
-    if not target_pod:
-        print(f" No pod starting with 'genai-perf' found in namespace '{namespace}'.")
-        return
 
+# Copies bench.sh into the genai-perf pod and logs in to Hugging Face there.
+# Returns False when bench.sh or the Hugging Face token is missing.
+def prepare_genai_perf_pod(namespace, target_pod):
+    config = load_config()
     local_shell_script_path = os.path.join(os.getcwd(), "bench.sh")
     if not os.path.exists(local_shell_script_path):
         print(f"bench.sh not found at {local_shell_script_path}")
-        return
+        return False
 
     model = config["final_exec"]["model"]
     pattern = config["profile"]["pattern"]
@@ -206,19 +213,33 @@ def exec_into_genai_perf_pod(namespace):
 
     if not hf_token:
         print(" 'hugging_face_token' not found in TOML config.")
-        return
+        return False
 
     login_cmd = f"huggingface-cli login --token {hf_token}"
 
-    subprocess.run(["kubectl", "exec", "-n", NAMESPACE, target_pod, "--", "bash", "-c", login_cmd], check=True)
+    subprocess.run(["kubectl", "exec", "-n", namespace, target_pod, "--", "bash", "-c", login_cmd], check=True)
 
     print(" Hugging Face CLI login completed.")
+    return True
+
+
+#  Executes commands inside the 'genai-perf' pod and performs setup tasks.
+def exec_into_genai_perf_pod(namespace):
+    config = load_config()
+    target_pod = find_genai_perf_pod(namespace)
+
+    if not target_pod:
+        print(f" No pod starting with 'genai-perf' found in namespace '{namespace}'.")
+        return False
+
+    if not prepare_genai_perf_pod(namespace, target_pod):
+        return False
 
     cluster_ip = config.get("values", {}).get("cluster_ip")
 
     if not cluster_ip:
         print(" Cluster IP not found in TOML config.")
-        return
+        return True
 
     url = f"http://{cluster_ip}/v1/models"
     print(f" Checking model serving at: {url}")
@@ -229,4 +250,5 @@ def exec_into_genai_perf_pod(namespace):
                                 stderr=subprocess.PIPE)
         print(" Response:\n", result.stdout)
     except subprocess.CalledProcessError as e:
-        print(" Failed to fetch model status:\n", e.stderr)
\ No newline at end of file
+        print(" Failed to fetch model status:\n", e.stderr)
+    return True
\ No newline at end of file
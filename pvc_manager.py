@@ -2,49 +2,26 @@ import os
 import subprocess
 import sys
 import toml
-from collections import OrderedDict
-import yaml
-from config_loader import load_config
+from manifest_renderer import PvcOverlay, render_manifest, kubectl_manifest
 
-# Load configuration from the centralized config loader
-config = load_config() 
-
-NAMESPACE = config["constants"]["namespace"]
-
-#  Updates the PVC YAML file with the specified storage class and size.
-def update_pvc_yaml(pvc_config):
+#  Renders the PVC manifest with the specified storage class and size and applies it.
+def apply_pvc_yaml(pvc_config, namespace):
     try:
-        with open(pvc_config["pvc_yaml_path"], 'r') as f:
-            pvc = yaml.safe_load(f)
-    except FileNotFoundError:
-        sys.exit(f" PVC YAML file not found: {pvc_config['pvc_yaml_path']}")
+        pvc = render_manifest(pvc_config["pvc_yaml_path"],
+                              PvcOverlay(pvc_config['storage_class'], pvc_config['storage_size']))
+    except (FileNotFoundError, ValueError) as e:
+        sys.exit(f" {e}")
     except Exception as e:
-        sys.exit(f" Failed to read PVC YAML: {e}")
-
-    # Validate the loaded PVC YAML content
-    if pvc is None:
-        sys.exit(f" PVC YAML file is empty: {pvc_config['pvc_yaml_path']}")
-
-    if 'spec' not in pvc:
-        sys.exit(f" PVC YAML missing 'spec' section: {pvc_config['pvc_yaml_path']}")
+        sys.exit(f" Failed to render PVC YAML: {e}")
 
-    pvc['spec']['storageClassName'] = pvc_config['storage_class']
-    pvc['spec']['resources']['requests']['storage'] = pvc_config['storage_size']
-
-    try:
-        # Write the updated PVC YAML back to the file
-        with open(pvc_config["pvc_yaml_path"], 'w') as f:
-            yaml.dump(pvc, f)
-        print(" PVC YAML updated successfully.")
-    except Exception as e:
-        sys.exit(f" Failed to write PVC YAML: {e}")
+    print(" PVC manifest rendered successfully.")
 
     try:
-         # Apply the updated PVC YAML to the Kubernetes namespace
-        subprocess.run(["kubectl", "apply", "-n", NAMESPACE, "-f", pvc_config["pvc_yaml_path"]], check=True)
-        print(f" PVC applied to namespace '{NAMESPACE}'")
+         # Apply the rendered PVC manifest to the Kubernetes namespace
+        kubectl_manifest("apply", pvc, namespace, check=True)
+        print(f" PVC applied to namespace '{namespace}'")
     except subprocess.CalledProcessError as e:
-        sys.exit(f" Failed to apply PVC YAML: {e}")
+        sys.exit(f" Failed to apply PVC YAML: {e.stderr}")
 
 
 
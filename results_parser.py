@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+
+FILE_TAG = "_genai_perf.json"
+
+# Result columns in the same order and with the same labels as the bench.sh --get-results CSV.
+RESULT_COLUMNS = [
+    ("use_case", "Use Case"),
+    ("concurrency", "Concurrency"),
+    ("input_tokens", "Input Tokens"),
+    ("output_tokens", "Output Tokens"),
+    ("ttft_avg", "TTFT Average"),
+    ("ttft_min", "TTFT Min"),
+    ("ttft_max", "TTFT Max"),
+    ("ttft_p90", "TTFT 90th Percentile"),
+    ("itl_avg", "ITL Average"),
+    ("itl_min", "ITL Min"),
+    ("itl_max", "ITL Max"),
+    ("itl_p90", "ITL 90th Percentile"),
+    ("latency_avg", "Request Latency Avg"),
+    ("latency_min", "Request Latency Min"),
+    ("latency_max", "Average Latency Max"),
+    ("latency_p90", "Request Latency 90th Percentile"),
+    ("output_token_throughput", "Output Token Throughput"),
+    ("request_throughput", "Request Throughput"),
+    ("request_count", "Request Count for BM"),
+]
+
+# Result column -> (metric, statistic) in the genai-perf JSON export.
+METRIC_FIELDS = {
+    "ttft_avg": ("time_to_first_token", "avg"),
+    "ttft_min": ("time_to_first_token", "min"),
+    "ttft_max": ("time_to_first_token", "max"),
+    "ttft_p90": ("time_to_first_token", "p90"),
+    "itl_avg": ("inter_token_latency", "avg"),
+    "itl_min": ("inter_token_latency", "min"),
+    "itl_max": ("inter_token_latency", "max"),
+    "itl_p90": ("inter_token_latency", "p90"),
+    "latency_avg": ("request_latency", "avg"),
+    "latency_min": ("request_latency", "min"),
+    "latency_max": ("request_latency", "max"),
+    "latency_p90": ("request_latency", "p90"),
+    "output_token_throughput": ("output_token_throughput", "avg"),
+    "request_throughput": ("request_throughput", "avg"),
+    "request_count": ("request_count", "avg"),
+}
+
+
+# Splits '<export>_<use case>_<concurrency>_<input>_<output>_genai_perf.json' into its parts.
+def parse_artifact_name(file_name):
+    if not file_name.endswith(FILE_TAG):
+        return None
+    parts = file_name[:-len(FILE_TAG)].rsplit("_", 4)
+    if len(parts) != 5 or not all(p.isdigit() for p in parts[2:]):
+        return None
+    export_file_name, use_case, concurrency, input_tokens, output_tokens = parts
+    return {
+        "export_file_name": export_file_name,
+        "use_case": use_case,
+        "concurrency": int(concurrency),
+        "input_tokens": int(input_tokens),
+        "output_tokens": int(output_tokens),
+    }
+
+
+# Reads one genai-perf JSON export into a result row, or returns None if the name or content is not usable.
+def parse_artifact(file_path):
+    row = parse_artifact_name(os.path.basename(file_path))
+    if row is None:
+        return None
+    try:
+        with open(file_path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f" Skipping unreadable artifact {file_path}: {e}")
+        return None
+
+    for column, (metric, stat) in METRIC_FIELDS.items():
+        row[column] = data.get(metric, {}).get(stat)
+    row["path"] = file_path
+    return row
+
+
+# Yields the path of every genai-perf JSON export under artifacts_dir.
+def iter_artifact_files(artifacts_dir):
+    for root, _, files in os.walk(artifacts_dir):
+        for file_name in files:
+            if file_name.endswith(FILE_TAG):
+                yield os.path.join(root, file_name)
+
+
+# Parses every genai-perf JSON export under artifacts_dir, optionally only those of one export_file_name.
+def collect_results(artifacts_dir, export_file_name=None):
+    rows = []
+    for file_path in iter_artifact_files(artifacts_dir):
+        # The export name is in the file name, so other runs' exports are skipped without being read
+        if export_file_name:
+            name = parse_artifact_name(os.path.basename(file_path))
+            if name is None or name["export_file_name"] != export_file_name:
+                continue
+        row = parse_artifact(file_path)
+        if row is not None:
+            rows.append(row)
+    rows.sort(key=lambda r: (r["export_file_name"], r["use_case"], r["concurrency"]))
+    return rows
+
+
+# Writes result rows as CSV, with any extra leading columns (e.g. cluster) before the bench.sh columns.
+def write_results_csv(rows, csv_path, extra_columns=()):
+    columns = list(extra_columns) + RESULT_COLUMNS
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([label for _, label in columns])
+        for row in rows:
+            writer.writerow([row.get(key) for key, _ in columns])
+    print(f" Results written to {csv_path}")
@@ -0,0 +1,264 @@
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+
+import toml
+
+from results_parser import FILE_TAG, METRIC_FIELDS, parse_artifact
+
+DEFAULT_DB_PATH = "results.db"
+RUN_METADATA_DIR = "runs"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT,
+    model TEXT,
+    image TEXT,
+    profile TEXT,
+    pattern TEXT,
+    cluster TEXT,
+    namespace TEXT,
+    replicas INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    use_case TEXT NOT NULL,
+    concurrency INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    {metric_columns},
+    path TEXT,
+    PRIMARY KEY (run_id, use_case, concurrency, input_tokens, output_tokens)
+);
+CREATE TABLE IF NOT EXISTS ingested_files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_use_case_concurrency ON results (use_case, concurrency);
+CREATE INDEX IF NOT EXISTS runs_model ON runs (model, started_at);
+CREATE INDEX IF NOT EXISTS runs_image ON runs (image, started_at);
+CREATE INDEX IF NOT EXISTS runs_profile ON runs (profile, started_at);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at);
+""".format(metric_columns=",\n    ".join(f"{column} REAL" for column in METRIC_FIELDS))
+
+
+# Columns added to the runs table after its first release, created on databases that predate them.
+_ADDED_RUN_COLUMNS = {"replicas": "INTEGER"}
+# Run metadata columns, in insert order.
+RUN_COLUMNS = ("started_at", "model", "image", "profile", "pattern", "cluster", "namespace", "replicas")
+
+
+# Opens the results database, creating the schema on first use.
+def connect(db_path=DEFAULT_DB_PATH):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    existing = {row["name"] for row in conn.execute("PRAGMA table_info(runs)")}
+    for column, column_type in _ADDED_RUN_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {column_type}")
+    return conn
+
+
+# Derives the run start time from the timestamp suffix that run_bench_script_from_pod appends to the export name.
+def _started_at_from_run_id(run_id):
+    try:
+        stamp = datetime.datetime.strptime(run_id[-15:], "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+    return stamp.isoformat()
+
+
+# Loads the metadata file written for a run at collect time, if there is one.
+def _load_run_metadata(artifacts_dir, run_id):
+    metadata_path = os.path.join(artifacts_dir, RUN_METADATA_DIR, f"{run_id}.json")
+    if not os.path.isfile(metadata_path):
+        return {}
+    try:
+        with open(metadata_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Yields (path, mtime, size) for every artifact file that is new or changed since it was last ingested.
+def _iter_new_files(artifacts_dir, known_files):
+    pending = [artifacts_dir]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError:
+            continue
+
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                pending.append(entry.path)
+            elif entry.name.endswith(FILE_TAG):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if known_files.get(entry.path) != (stat.st_mtime, stat.st_size):
+                    yield entry.path, stat.st_mtime, stat.st_size
+
+
+# Ingests every genai-perf export under artifacts_dir that is not yet in the database.
+def ingest(artifacts_dir, db_path=DEFAULT_DB_PATH):
+    artifacts_dir = os.path.abspath(artifacts_dir)
+    if not os.path.isdir(artifacts_dir):
+        raise FileNotFoundError(f"Artifacts directory not found: {artifacts_dir}")
+
+    conn = connect(db_path)
+    known_files = {path: (mtime, size) for path, mtime, size in
+                   conn.execute("SELECT path, mtime, size FROM ingested_files")}
+    metric_columns = list(METRIC_FIELDS)
+    insert_result = (
+        f"INSERT OR REPLACE INTO results (run_id, use_case, concurrency, input_tokens, output_tokens, "
+        f"{', '.join(metric_columns)}, path) VALUES ({', '.join('?' * (len(metric_columns) + 6))})"
+    )
+
+    seen_runs = set()
+    ingested = 0
+    with conn:
+        for file_path, mtime, size in _iter_new_files(artifacts_dir, known_files):
+            # Recorded even when unparsable, so the file is only read again once it changes
+            conn.execute("INSERT OR REPLACE INTO ingested_files (path, mtime, size) VALUES (?, ?, ?)",
+                         (file_path, mtime, size))
+            row = parse_artifact(file_path)
+            if row is None:
+                continue
+            run_id = row["export_file_name"]
+            if run_id not in seen_runs:
+                metadata = _load_run_metadata(artifacts_dir, run_id)
+                metadata["started_at"] = metadata.get("started_at") or _started_at_from_run_id(run_id)
+                # Metadata written after a first ingest fills in the columns it left empty
+                conn.execute(
+                    f"INSERT INTO runs (run_id, {', '.join(RUN_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * (len(RUN_COLUMNS) + 1))}) ON CONFLICT(run_id) DO UPDATE SET "
+                    + ", ".join(f"{c} = COALESCE(excluded.{c}, runs.{c})" for c in RUN_COLUMNS),
+                    [run_id] + [metadata.get(c) for c in RUN_COLUMNS]
+                )
+                seen_runs.add(run_id)
+            conn.execute(insert_result, [run_id, row["use_case"], row["concurrency"], row["input_tokens"],
+                                         row["output_tokens"]] + [row[c] for c in metric_columns] + [file_path])
+            ingested += 1
+    conn.close()
+
+    print(f" Ingested {ingested} result(s) from {len(seen_runs)} run(s) into {db_path}")
+    return ingested
+
+
+# Queries results by use case, concurrency, model, image, profile or cluster.
+# last_images / last_runs restrict the answer to the most recent distinct images or runs.
+def query_results(db_path=DEFAULT_DB_PATH, metrics=("ttft_p90",), use_case=None, concurrency=None,
+                  model=None, image=None, profile=None, cluster=None, last_images=None, last_runs=None):
+    unknown = [m for m in metrics if m not in METRIC_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown metric(s) {unknown}, choose from: {', '.join(METRIC_FIELDS)}")
+
+    where, params = [], []
+    for column, value in (("r.use_case", use_case), ("r.concurrency", concurrency), ("u.model", model),
+                          ("u.image", image), ("u.profile", profile), ("u.cluster", cluster)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+    if last_images:
+        where.append("u.image IN (SELECT image FROM runs WHERE image IS NOT NULL "
+                     "GROUP BY image ORDER BY MAX(started_at) DESC LIMIT ?)")
+        params.append(int(last_images))
+    if last_runs:
+        where.append("u.run_id IN (SELECT run_id FROM runs ORDER BY started_at DESC LIMIT ?)")
+        params.append(int(last_runs))
+
+    sql = (
+        "SELECT u.run_id, u.started_at, u.model, u.image, u.profile, u.cluster, u.replicas, "
+        "r.use_case, r.concurrency, r.input_tokens, r.output_tokens, "
+        + ", ".join(f"r.{m}" for m in metrics)
+        + " FROM results r JOIN runs u ON u.run_id = r.run_id"
+        + (" WHERE " + " AND ".join(where) if where else "")
+        + " ORDER BY u.started_at DESC, r.use_case, r.concurrency"
+    )
+    conn = connect(db_path)
+    rows = [dict(row) for row in conn.execute(sql, params)]
+    conn.close()
+    return rows
+
+
+# Writes the metadata of a finished run next to its artifacts so ingest can index it.
+# cluster defaults to [results] cluster; replicas is set by the scaling sweep.
+def write_run_metadata(destination_path, run_id, config, cluster=None, replicas=None):
+    profile = config.get("profile", {})
+    metadata = {
+        "run_id": run_id,
+        "started_at": _started_at_from_run_id(run_id),
+        "model": config.get("final_exec", {}).get("model"),
+        "image": profile.get("image"),
+        "profile": profile.get("selected_model_id"),
+        "pattern": profile.get("pattern"),
+        "cluster": cluster or config.get("results", {}).get("cluster"),
+        "namespace": config.get("constants", {}).get("namespace"),
+        "replicas": replicas,
+    }
+    metadata_dir = os.path.join(destination_path, RUN_METADATA_DIR)
+    os.makedirs(metadata_dir, exist_ok=True)
+    with open(os.path.join(metadata_dir, f"{run_id}.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def _default_artifacts_dir():
+    config_path = os.environ.get("GENAI_PERF_CONFIG") or os.path.join(os.getcwd(), "user_input.toml")
+    if not os.path.isfile(config_path):
+        return None
+    return toml.load(config_path).get("paths", {}).get("destination_path")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexed store of GenAI-Perf results.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database path.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = sub.add_parser("ingest", help="Ingest new artifacts into the database.")
+    ingest_parser.add_argument("--artifacts-dir", help="Defaults to [paths] destination_path in the TOML.")
+
+    query_parser = sub.add_parser("query", help="Query ingested results.")
+    query_parser.add_argument("--metric", action="append", dest="metrics",
+                              help=f"Metric column, may be repeated: {', '.join(METRIC_FIELDS)}")
+    query_parser.add_argument("--use-case")
+    query_parser.add_argument("--concurrency", type=int)
+    query_parser.add_argument("--model")
+    query_parser.add_argument("--image")
+    query_parser.add_argument("--profile")
+    query_parser.add_argument("--cluster")
+    query_parser.add_argument("--last-images", type=int, help="Only the N most recently benchmarked images.")
+    query_parser.add_argument("--last-runs", type=int, help="Only the N most recent runs.")
+    query_parser.add_argument("--json", action="store_true", help="Print rows as JSON.")
+
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        artifacts_dir = args.artifacts_dir or _default_artifacts_dir()
+        if not artifacts_dir:
+            sys.exit(" No --artifacts-dir given and no destination_path found in the TOML.")
+        ingest(artifacts_dir, args.db)
+        return
+
+    metrics = args.metrics or ["ttft_p90"]
+    rows = query_results(args.db, metrics, args.use_case, args.concurrency, args.model, args.image,
+                         args.profile, args.cluster, args.last_images, args.last_runs)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    columns = ["started_at", "image", "use_case", "concurrency"] + metrics
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if row[c] is None else str(row[c]) for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import subprocess
+
+# Annotation stamped on the secrets so a later run can tell whether they hold the current keys.
+SECRET_HASH_ANNOTATION = "genai-perf-automation/secret-hash"
+SECRET_NAMES = ("ngc-secret", "nvidia-nim-secrets")
+
+
+# Returns a stable hash of the keys stored in the cluster secrets.
+def compute_secret_hash(ngc_api_key, hf_token):
+    return hashlib.sha256(f"{ngc_api_key}\0{hf_token}".encode()).hexdigest()
+
+
+# Stamps the secret hash on every managed secret in the namespace.
+def annotate_secrets(namespace, secret_hash):
+    for secret_name in SECRET_NAMES:
+        subprocess.run([
+            "kubectl", "annotate", "secret", secret_name, "-n", namespace,
+            f"{SECRET_HASH_ANNOTATION}={secret_hash}", "--overwrite"
+        ], check=True, stdout=subprocess.DEVNULL)
+
+
+# Runs 'kubectl get ... -o json' and returns the parsed object, or None if it does not exist.
+def kubectl_get_json(args):
+    result = subprocess.run(
+        ["kubectl", "get"] + list(args) + ["-o", "json"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        return None
+
+
+# Checks that every managed secret carries the expected hash annotation.
+def secrets_match(namespace, secret_hash):
+    for secret_name in SECRET_NAMES:
+        secret = kubectl_get_json(["secret", secret_name, "-n", namespace])
+        if secret is None:
+            print(f" Secret '{secret_name}' not found.")
+            return False
+        annotations = secret.get("metadata", {}).get("annotations") or {}
+        if annotations.get(SECRET_HASH_ANNOTATION) != secret_hash:
+            print(f" Secret '{secret_name}' does not match the configured keys.")
+            return False
+    return True
+
+
+# Checks that the live ClusterServingRuntime runs the image and profile of the rendered manifest.
+def runtime_matches(runtime_manifest):
+    runtime_name = runtime_manifest["metadata"]["name"]
+    live = kubectl_get_json(["clusterservingruntime", runtime_name])
+    if live is None:
+        print(f" ClusterServingRuntime '{runtime_name}' not found.")
+        return False
+
+    def image_and_profile(manifest):
+        container = manifest["spec"]["containers"][0]
+        profile = next((env.get("value") for env in container.get("env", [])
+                        if env.get("name") == "NIM_MODEL_PROFILE"), None)
+        return container.get("image"), profile
+
+    if image_and_profile(live) != image_and_profile(runtime_manifest):
+        print(f" ClusterServingRuntime '{runtime_name}' image or profile differs from the configuration.")
+        return False
+    return True
+
+
+# Returns True when the InferenceService reports a 'Ready' condition with status 'True'.
+def inference_service_ready(namespace, isvc_name):
+    isvc = kubectl_get_json(["inferenceservice", isvc_name, "-n", namespace])
+    if isvc is None:
+        print(f" InferenceService '{isvc_name}' not found.")
+        return False
+    conditions = isvc.get("status", {}).get("conditions") or []
+    ready = any(c.get("type") == "Ready" and c.get("status") == "True" for c in conditions)
+    if not ready:
+        print(f" InferenceService '{isvc_name}' is not ready.")
+    return ready
+
+
+# Returns True when the endpoint at cluster_ip lists the expected model under /v1/models.
+def served_model_matches(cluster_ip, model):
+    if not cluster_ip:
+        print(" Cluster IP not found in TOML config.")
+        return False
+
+    url = f"http://{cluster_ip}/v1/models"
+    result = subprocess.run(["curl", "-s", "-m", "10", url], universal_newlines=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        print(f" Model endpoint {url} is not reachable.")
+        return False
+    try:
+        served = [m.get("id") for m in json.loads(result.stdout).get("data", [])]
+    except (ValueError, AttributeError):
+        print(f" Unexpected response from {url}: {result.stdout}")
+        return False
+    if model not in served:
+        print(f" Endpoint serves {served}, expected '{model}'.")
+        return False
+    return True
+
+
+# Checks the live cluster state against the configuration and reports whether it can be reused.
+def deployment_is_reusable(namespace, secret_hash, runtime_manifest, isvc_name, cluster_ip, model):
+    print(f" Checking for a reusable deployment in namespace '{namespace}'...")
+    checks = (
+        lambda: secrets_match(namespace, secret_hash),
+        lambda: runtime_matches(runtime_manifest),
+        lambda: inference_service_ready(namespace, isvc_name),
+        lambda: served_model_matches(cluster_ip, model),
+    )
+    # Stop at the first mismatch so a stale deployment costs as few kubectl calls as possible
+    for check in checks:
+        if not check():
+            print(" Existing deployment cannot be reused. Running the full deployment.")
+            return False
+    print(" Existing deployment matches the configuration.")
+    return True
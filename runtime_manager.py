@@ -1,50 +1,21 @@
-import os
 import subprocess
 import time
-import yaml
+from pathlib import Path
+from config_loader import load_config, read_paths_from_toml
+from manifest_renderer import RuntimeOverlay, DeployOverlay, render_manifest, create_or_apply_manifest
+from reuse_manager import kubectl_get_json
 
-# Updates the runtime YAML file with the specified image and model ID. 
-def update_runtime_yaml(runtime_yaml_path, image, selected_model_id):
-    with open(runtime_yaml_path, "r") as f:
-        runtime_yaml = yaml.safe_load(f)
+# Renders the runtime manifest in memory with the specified image and model ID.
+def render_runtime_yaml(runtime_yaml_path, image, selected_model_id):
+    runtime_manifest = render_manifest(runtime_yaml_path, RuntimeOverlay(image, selected_model_id))
+    print(" Runtime manifest rendered.")
+    return runtime_manifest
 
-    
-    # Update the container image
-    runtime_yaml['spec']['containers'][0]['image'] = image
 
-    # Update the environment variable for the model profile
-    for env_var in runtime_yaml['spec']['containers'][0]['env']:
-        if env_var['name'] == "NIM_MODEL_PROFILE":
-            env_var['value'] = selected_model_id
-            break
-
-    with open(runtime_yaml_path, "w") as f:
-        yaml.safe_dump(runtime_yaml, f)
-
-    print(" Runtime YAML updated.")
-
-
-#  Applies the runtime YAML file to the specified Kubernetes namespace.
-def apply_runtime_yaml(runtime_yaml_path, NAMESPACE):
-    print(f" Applying runtime YAML in namespace '{NAMESPACE}'...")
-    try:
-        subprocess.run(
-            ["kubectl", "create", "-f", runtime_yaml_path, "-n", NAMESPACE],
-            universal_newlines=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        print(" Created runtime successfully.")
-    except subprocess.CalledProcessError as e:
-        if "AlreadyExists" in e.stderr.decode():
-            print("  Runtime already exists. Applying update instead...")
-            subprocess.run(
-                ["kubectl", "apply", "-f", runtime_yaml_path, "-n", NAMESPACE],
-                universal_newlines=True
-            )
-            print(" Applied update to existing runtime.")
-        else:
-            raise  
+#  Applies the rendered runtime manifest to the specified Kubernetes namespace.
+def apply_runtime_yaml(runtime_manifest, NAMESPACE):
+    print(f" Applying runtime manifest in namespace '{NAMESPACE}'...")
+    create_or_apply_manifest(runtime_manifest, NAMESPACE, kind_label="Runtime")
 
 
 #  Waits for the ClusterServingRuntime to become available in the specified namespace.
@@ -67,56 +38,17 @@ def wait_for_clusterservingruntime(NAMESPACE, timeout=180):
     raise TimeoutError("ClusterServingRuntime not found in time.")
 
 
-#  Updates the runtime name in the deploy YAML file.
-def update_runtime_in_deploy_yaml(deploy_yaml_path, runtime_name):
-    with open(deploy_yaml_path, 'r') as f:
-        deploy_config = yaml.safe_load(f)
-
-      # Update the runtime name in the deploy configuration
-    deploy_config['spec']['predictor']['model']['runtime'] = runtime_name
+#  Renders the deploy manifest in memory with the specified runtime name.
+def render_deploy_yaml(deploy_yaml_path, runtime_name):
+    deploy_manifest = render_manifest(deploy_yaml_path, DeployOverlay(runtime_name))
+    print(f" Rendered deploy manifest from {deploy_yaml_path} with runtime '{runtime_name}'")
+    return deploy_manifest
 
-    with open(deploy_yaml_path, 'w') as f:
-        yaml.safe_dump(deploy_config, f)
 
-    print(f" Updated runtime to '{runtime_name}' in {deploy_yaml_path}")
-
-
-#  Creates or applies the deploy YAML file in the specified Kubernetes namespace.
-def create_or_apply_deploy_yaml(deploy_yaml_path, namespace):
-    if not deploy_yaml_path or not os.path.isfile(deploy_yaml_path):
-        print(f"Deploy YAML path not found or invalid: {deploy_yaml_path}")
-        return
-
-    print(f" Creating deploy YAML in namespace '{namespace}' from '{deploy_yaml_path}'...")
-
-    try:
-        subprocess.run(
-            ["kubectl", "create", "-f", deploy_yaml_path, "-n", namespace],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        print(" Deploy YAML created successfully.")
-
-    except subprocess.CalledProcessError as e:
-        stderr_output = e.stderr.decode() if e.stderr else ""
-        print(f" Create failed with error:\n{stderr_output}")
-
-        if "AlreadyExists" in stderr_output:
-            print(" InferenceService already exists. Applying update instead...")
-            try:
-                subprocess.run(
-                    ["kubectl", "apply", "-f", deploy_yaml_path, "-n", namespace],
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                print(" Deploy YAML applied successfully.")
-            except subprocess.CalledProcessError as apply_err:
-                print(" Failed to apply updated InferenceService:\n", apply_err.stderr.decode())
-                raise
-        else:
-            raise
+#  Creates or applies the rendered deploy manifest in the specified Kubernetes namespace.
+def create_or_apply_deploy_yaml(deploy_manifest, namespace):
+    print(f" Creating InferenceService in namespace '{namespace}'...")
+    create_or_apply_manifest(deploy_manifest, namespace, kind_label="InferenceService")
 
     # Check the status of pods in the namespace
     print(f" Checking pod status in namespace '{namespace}'...")
@@ -125,3 +57,48 @@ def create_or_apply_deploy_yaml(deploy_yaml_path, namespace):
     except subprocess.CalledProcessError as e:
         print(" Failed to get pods:\n", e.stderr.decode() if e.stderr else str(e))
 
+
+# Renders the runtime and InferenceService manifests from the current configuration.
+def render_deployment_manifests():
+    data = load_config()
+
+    runtime_yaml, deploy_yaml = read_paths_from_toml()
+    image = data["profile"]["image"]
+    selected_model_id = data["profile"]["selected_model_id"]
+
+    runtime_manifest = render_runtime_yaml(runtime_yaml, image, selected_model_id)
+
+    runtime_name = Path(runtime_yaml).stem
+    deploy_manifest = render_deploy_yaml(deploy_yaml, runtime_name)
+    return runtime_manifest, deploy_manifest
+
+
+#  Returns the number of ready predictor pods of the InferenceService.
+def count_ready_predictor_pods(namespace, isvc_name):
+    pods = kubectl_get_json(["pods", "-n", namespace, "-l", f"serving.kserve.io/inferenceservice={isvc_name}"])
+    ready = 0
+    for pod in (pods or {}).get("items", []):
+        if pod["metadata"].get("deletionTimestamp"):
+            continue
+        statuses = pod.get("status", {}).get("containerStatuses") or []
+        if statuses and all(s.get("ready") for s in statuses):
+            ready += 1
+    return ready
+
+
+#  Waits until the InferenceService is Ready and, when replicas is given, exactly that many predictor pods are ready.
+def wait_for_inference_service_ready(namespace, isvc_name, replicas=None, timeout=1800):
+    print(f" Waiting for InferenceService '{isvc_name}' to be ready"
+          f"{f' with {replicas} replica(s)' if replicas else ''}...")
+    end_time = time.time() + timeout
+    while time.time() < end_time:
+        isvc = kubectl_get_json(["inferenceservice", isvc_name, "-n", namespace]) or {}
+        conditions = isvc.get("status", {}).get("conditions") or []
+        ready = any(c.get("type") == "Ready" and c.get("status") == "True" for c in conditions)
+        ready_pods = count_ready_predictor_pods(namespace, isvc_name) if ready and replicas else None
+        if ready and (replicas is None or ready_pods == replicas):
+            print(f" InferenceService '{isvc_name}' is ready.")
+            return
+        print(f" InferenceService ready: {ready}" + (f", ready replicas: {ready_pods}/{replicas}" if replicas else ""))
+        time.sleep(10)
+    raise TimeoutError(f"InferenceService '{isvc_name}' not ready within {timeout} seconds.")
@@ -0,0 +1,124 @@
+import json
+import os
+import subprocess
+import time
+
+from config_loader import get_user_input_path, load_config
+from reuse_manager import kubectl_get_json
+from results_parser import collect_results
+from results_store import write_run_metadata
+from runtime_manager import wait_for_inference_service_ready
+from utils import copy_artifacts_from_pod_using_toml, run_bench_script_from_pod
+
+
+# Parses a comma-separated list of integers such as "1,2,4".
+def parse_int_list(value):
+    if isinstance(value, (list, tuple)):
+        return [int(v) for v in value]
+    return [int(v) for v in str(value).split(",") if v.strip()]
+
+
+# Sets the predictor replica count of the InferenceService by pinning min and max replicas.
+def patch_replicas(namespace, isvc_name, replicas):
+    patch = {"spec": {"predictor": {"minReplicas": replicas, "maxReplicas": replicas}}}
+    print(f" Scaling InferenceService '{isvc_name}' to {replicas} replica(s)...")
+    subprocess.run(["kubectl", "patch", "inferenceservice", isvc_name, "-n", namespace,
+                    "--type", "merge", "-p", json.dumps(patch)], check=True, stdout=subprocess.DEVNULL)
+
+
+# Returns the predictor min/max replicas currently set on the InferenceService.
+def get_replica_spec(namespace, isvc_name):
+    isvc = kubectl_get_json(["inferenceservice", isvc_name, "-n", namespace])
+    if isvc is None:
+        raise RuntimeError(f"InferenceService '{isvc_name}' not found in namespace '{namespace}'.")
+    predictor = isvc.get("spec", {}).get("predictor", {})
+    return predictor.get("minReplicas"), predictor.get("maxReplicas")
+
+
+# Computes throughput per replica and scaling efficiency relative to the smallest replica count.
+# Points are matched by per-replica concurrency, so efficiency 1.0 means perfectly linear scaling.
+def build_scaling_report(points):
+    baseline = {}
+    for point in sorted(points, key=lambda p: p["replicas"]):
+        key = (point["use_case"], point["per_replica_concurrency"])
+        throughput = point["output_token_throughput"]
+        if throughput is None:
+            continue
+        point["throughput_per_replica"] = throughput / point["replicas"]
+        if key not in baseline:
+            baseline[key] = point["throughput_per_replica"]
+        point["scaling_efficiency"] = point["throughput_per_replica"] / baseline[key] if baseline[key] else None
+    return points
+
+
+# Prints the scaling report as a table.
+def print_scaling_report(points):
+    header = f"{'Use Case':<16} {'Replicas':>8} {'Conc':>6} {'Tok/s':>10} {'Tok/s/rep':>10} {'Efficiency':>10} {'TTFT p90':>9}"
+    print(header)
+    print("-" * len(header))
+    for p in points:
+        def fmt(value, width, digits):
+            return f"{value:>{width}.{digits}f}" if isinstance(value, (int, float)) else f"{'n/a':>{width}}"
+        print(f"{p['use_case']:<16} {p['replicas']:>8} {p['concurrency']:>6} {fmt(p['output_token_throughput'], 10, 1)} "
+              f"{fmt(p.get('throughput_per_replica'), 10, 1)} {fmt(p.get('scaling_efficiency'), 10, 2)} "
+              f"{fmt(p['ttft_p90'], 9, 1)}")
+
+
+# Runs the configured sweep subset at every replica count, with concurrency proportional to the replica count.
+def run_scaling_sweep(namespace, isvc_name, target_pod):
+    config = load_config()
+    scaling = config.get("scaling", {})
+    final_exec = config.get("final_exec", {})
+
+    replica_counts = parse_int_list(scaling.get("replicas", "1,2,4"))
+    base_concurrency = parse_int_list(scaling.get("concurrency_values", final_exec.get("concurrency_values")))
+    use_cases = scaling.get("use_cases", final_exec.get("use_cases"))
+    timeout = int(scaling.get("ready_timeout", 1800))
+    destination_path = config["paths"]["destination_path"]
+
+    original_min, original_max = get_replica_spec(namespace, isvc_name)
+    points = []
+    try:
+        for replicas in replica_counts:
+            patch_replicas(namespace, isvc_name, replicas)
+            wait_for_inference_service_ready(namespace, isvc_name, replicas=replicas, timeout=timeout)
+
+            overrides = {
+                "use_cases": use_cases,
+                "concurrency_values": ",".join(str(c * replicas) for c in base_concurrency),
+                "export_file_name": f"{final_exec['export_file_name']}-r{replicas}",
+            }
+            run_id = run_bench_script_from_pod(get_user_input_path(), target_pod, namespace, overrides=overrides)
+            copy_artifacts_from_pod_using_toml(namespace, target_pod)
+            write_run_metadata(destination_path, run_id, config, replicas=replicas)
+
+            for row in collect_results(destination_path, export_file_name=run_id):
+                points.append({
+                    "replicas": replicas,
+                    "run_id": run_id,
+                    "use_case": row["use_case"],
+                    "concurrency": row["concurrency"],
+                    "per_replica_concurrency": row["concurrency"] // replicas,
+                    "output_token_throughput": row["output_token_throughput"],
+                    "request_throughput": row["request_throughput"],
+                    "ttft_p90": row["ttft_p90"],
+                    "itl_p90": row["itl_p90"],
+                    "latency_p90": row["latency_p90"],
+                })
+    finally:
+        # Put the InferenceService back to the replica spec it had before the sweep
+        restore = {"spec": {"predictor": {"minReplicas": original_min, "maxReplicas": original_max}}}
+        print(f" Restoring InferenceService '{isvc_name}' replicas to min={original_min}, max={original_max}...")
+        subprocess.run(["kubectl", "patch", "inferenceservice", isvc_name, "-n", namespace,
+                        "--type", "merge", "-p", json.dumps(restore)], stdout=subprocess.DEVNULL)
+
+    points = build_scaling_report(points)
+    points.sort(key=lambda p: (p["use_case"], p["per_replica_concurrency"], p["replicas"]))
+    print_scaling_report(points)
+
+    report_path = os.path.join(destination_path, f"scaling-{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, "w") as f:
+        json.dump({"isvc": isvc_name, "replicas": replica_counts, "base_concurrency": base_concurrency,
+                   "points": points}, f, indent=2)
+    print(f" Scaling report written to {report_path}")
+    return report_path
@@ -0,0 +1,386 @@
+import argparse
+import http.client
+import itertools
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import toml
+import yaml
+
+from manifest_renderer import manifest_name
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PORT = 8765
+DEFAULT_POOL_LIMIT = 1
+
+
+# Returns the ClusterServingRuntime name from the job's runtime manifest, relative paths resolving against the repo.
+# The file is read on every submit so the long-running daemon never holds a stale copy.
+def _runtime_name(runtime_path):
+    if not runtime_path:
+        return None
+    if not os.path.isabs(runtime_path):
+        runtime_path = os.path.join(REPO_DIR, runtime_path)
+    try:
+        with open(runtime_path, "r") as f:
+            return manifest_name(yaml.safe_load(f) or {})
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Runtime manifest not found: {runtime_path}")
+
+
+# Reads the scheduling attributes of a job from its TOML configuration.
+def describe_job_config(toml_path):
+    config = toml.load(toml_path)
+    profile = config.get("profile", {})
+    scheduler_cfg = config.get("scheduler", {})
+
+    # The GPU pool defaults to the first token of the profile pattern, e.g. 'l40s' in 'l40s-bf16-tp1-pp1-throughput'
+    gpu_pool = scheduler_cfg.get("gpu_pool") or profile.get("pattern", "default").split("-")[0]
+    model_key = (profile.get("image"), profile.get("pattern"), config.get("final_exec", {}).get("model"))
+    return {
+        "namespace": config["constants"]["namespace"],
+        "runtime_name": _runtime_name(config.get("paths", {}).get("runtime")),
+        "gpu_pool": gpu_pool,
+        "model_key": list(model_key),
+        "priority": int(scheduler_cfg.get("priority", 0)),
+    }
+
+
+class JobScheduler:
+    """Priority queue of benchmark jobs with per-GPU-pool concurrency limits.
+
+    Jobs that target the same namespace never run at the same time, nor do jobs that
+    apply the same ClusterServingRuntime, which is cluster-scoped. When a namespace
+    already hosts the model a job asks for, the job is started with --reuse so the
+    warm deployment is picked up instead of redeployed.
+    """
+
+    def __init__(self, pool_limits=None, default_pool_limit=DEFAULT_POOL_LIMIT,
+                 logs_dir=os.path.join(REPO_DIR, "logs")):
+        self.pool_limits = dict(pool_limits or {})
+        self.default_pool_limit = default_pool_limit
+        self.logs_dir = logs_dir
+        self.jobs = {}
+        self.queue = []
+        self.running_pools = {}
+        self.busy_namespaces = set()
+        self.busy_runtimes = set()
+        self.warm_models = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Condition()
+        self._stopped = False
+
+    def submit(self, toml_path, priority=None, gpu_pool=None):
+        toml_path = os.path.abspath(toml_path)
+        if not os.path.isfile(toml_path):
+            raise FileNotFoundError(f"Job TOML not found: {toml_path}")
+
+        job = describe_job_config(toml_path)
+        if priority is not None:
+            job["priority"] = int(priority)
+        if gpu_pool:
+            job["gpu_pool"] = gpu_pool
+
+        with self._lock:
+            job_id = next(self._ids)
+            job.update({
+                "id": job_id,
+                "toml_path": toml_path,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "returncode": None,
+                "reuse": False,
+                "log_path": os.path.join(self.logs_dir, f"scheduler_job_{job_id}.log"),
+            })
+            self.jobs[job_id] = job
+            self.queue.append(job_id)
+            self._lock.notify_all()
+        print(f" Queued job {job_id} ({toml_path}) in pool '{job['gpu_pool']}' with priority {job['priority']}")
+        return dict(job)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            if job["status"] != "queued":
+                return False
+            self.queue.remove(job_id)
+            job["status"] = "cancelled"
+            return True
+
+    def get(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self):
+        with self._lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all()
+
+    def _is_warm(self, job):
+        return self.warm_models.get(job["namespace"]) == job["model_key"]
+
+    def _can_start(self, job):
+        if job["namespace"] in self.busy_namespaces:
+            return False
+        if job["runtime_name"] and job["runtime_name"] in self.busy_runtimes:
+            return False
+        limit = self.pool_limits.get(job["gpu_pool"], self.default_pool_limit)
+        return self.running_pools.get(job["gpu_pool"], 0) < limit
+
+    # Picks every queued job that fits right now, highest priority first, warm deployments breaking ties.
+    def _take_runnable(self):
+        order = sorted(self.queue, key=lambda jid: (-self.jobs[jid]["priority"],
+                                                    not self._is_warm(self.jobs[jid]), jid))
+        started = []
+        for job_id in order:
+            job = self.jobs[job_id]
+            if not self._can_start(job):
+                continue
+            self.queue.remove(job_id)
+            self.busy_namespaces.add(job["namespace"])
+            if job["runtime_name"]:
+                self.busy_runtimes.add(job["runtime_name"])
+            self.running_pools[job["gpu_pool"]] = self.running_pools.get(job["gpu_pool"], 0) + 1
+            job["reuse"] = self._is_warm(job)
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            started.append(job)
+        return started
+
+    def _run_job(self, job):
+        cmd = [sys.executable, os.path.join(REPO_DIR, "main.py")]
+        if job["reuse"]:
+            cmd.append("--reuse")
+        # The pipeline logs into the job log too, next to the kubectl output captured below
+        env = dict(os.environ, GENAI_PERF_CONFIG=job["toml_path"], GENAI_PERF_LOG=job["log_path"])
+
+        print(f" Starting job {job['id']} in namespace '{job['namespace']}'"
+              f"{' reusing the warm deployment' if job['reuse'] else ''}...")
+        returncode = None
+        try:
+            os.makedirs(self.logs_dir, exist_ok=True)
+            with open(job["log_path"], "a") as log_file:
+                returncode = subprocess.call(cmd, cwd=REPO_DIR, env=env,
+                                             stdout=log_file, stderr=subprocess.STDOUT)
+        except Exception as e:
+            job["error"] = str(e)
+            print(f" Job {job['id']} could not be run: {e}")
+        finally:
+            # Always release the pool slot, namespace and runtime, or the queue would stall behind this job
+            with self._lock:
+                job["returncode"] = returncode
+                job["finished_at"] = time.time()
+                job["status"] = "succeeded" if returncode == 0 else "failed"
+                self.busy_namespaces.discard(job["namespace"])
+                self.busy_runtimes.discard(job["runtime_name"])
+                self.running_pools[job["gpu_pool"]] -= 1
+                if returncode == 0:
+                    self.warm_models[job["namespace"]] = job["model_key"]
+                else:
+                    # A failed run may have left the namespace half deployed
+                    self.warm_models.pop(job["namespace"], None)
+                self._lock.notify_all()
+        print(f" Job {job['id']} finished with status '{job['status']}'")
+
+    # Dispatch loop: starts runnable jobs and sleeps until a job is queued or finishes.
+    def run_forever(self):
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+                started = self._take_runnable()
+                if not started:
+                    self._lock.wait()
+                    continue
+            for job in started:
+                threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+
+
+def _make_handler(scheduler):
+    class SchedulerRequestHandler(BaseHTTPRequestHandler):
+        def address_string(self):
+            # Unix socket peers have no (host, port) address
+            return self.client_address[0] if self.client_address else "unix"
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _job_id(self):
+            parts = self.path.rstrip("/").split("/")
+            if len(parts) == 3 and parts[1] == "jobs" and parts[2].isdigit():
+                return int(parts[2])
+            return None
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/jobs":
+                self._send_json(200, scheduler.list())
+                return
+            job_id = self._job_id()
+            job = scheduler.get(job_id) if job_id is not None else None
+            if job is None:
+                self._send_json(404, {"error": "job not found"})
+            else:
+                self._send_json(200, job)
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                job = scheduler.submit(request["toml_path"], request.get("priority"), request.get("gpu_pool"))
+            except (KeyError, ValueError, FileNotFoundError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            self._send_json(201, job)
+
+        def do_DELETE(self):
+            job_id = self._job_id()
+            try:
+                cancelled = scheduler.cancel(job_id)
+            except KeyError:
+                self._send_json(404, {"error": "job not found"})
+                return
+            if cancelled:
+                self._send_json(200, {"id": job_id, "status": "cancelled"})
+            else:
+                self._send_json(409, {"error": "only queued jobs can be cancelled"})
+
+    return SchedulerRequestHandler
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+# Starts the scheduler and serves the job API until interrupted.
+def serve(scheduler, host="127.0.0.1", port=DEFAULT_PORT, unix_socket=None):
+    handler = _make_handler(scheduler)
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, handler)
+        print(f" Benchmark scheduler listening on unix socket {unix_socket}")
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        print(f" Benchmark scheduler listening on http://{host}:{port}")
+
+    threading.Thread(target=scheduler.run_forever, daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(" Scheduler shutting down...")
+    finally:
+        scheduler.stop()
+        server.server_close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.remove(unix_socket)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path):
+        super().__init__("localhost")
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+# Sends one request to a running scheduler and returns the decoded JSON response.
+def request_scheduler(method, path, payload=None, host="127.0.0.1", port=DEFAULT_PORT, unix_socket=None):
+    conn = UnixHTTPConnection(unix_socket) if unix_socket else http.client.HTTPConnection(host, port)
+    body = json.dumps(payload) if payload is not None else None
+    headers = {"Content-Type": "application/json"} if body else {}
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    data = json.loads(response.read() or b"null")
+    conn.close()
+    return response.status, data
+
+
+def _parse_pool_limits(values):
+    limits = {}
+    for value in values or []:
+        pool, _, limit = value.partition("=")
+        if not pool or not limit.isdigit():
+            raise ValueError(f"Invalid --pool-limit '{value}', expected POOL=N")
+        limits[pool] = int(limit)
+    return limits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue GenAI-Perf benchmark jobs on a shared cluster.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix-socket", help="Serve or connect on a Unix socket instead of TCP.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = sub.add_parser("serve", help="Run the scheduler daemon.")
+    serve_parser.add_argument("--pool-limit", action="append", metavar="POOL=N",
+                              help="Maximum concurrent jobs for a GPU pool, may be repeated.")
+    serve_parser.add_argument("--default-pool-limit", type=int, default=DEFAULT_POOL_LIMIT)
+
+    submit_parser = sub.add_parser("submit", help="Queue a TOML configuration as a job.")
+    submit_parser.add_argument("toml_path")
+    submit_parser.add_argument("--priority", type=int)
+    submit_parser.add_argument("--gpu-pool")
+
+    sub.add_parser("list", help="List all jobs.")
+    status_parser = sub.add_parser("status", help="Show one job.")
+    status_parser.add_argument("job_id", type=int)
+    cancel_parser = sub.add_parser("cancel", help="Cancel a queued job.")
+    cancel_parser.add_argument("job_id", type=int)
+
+    args = parser.parse_args()
+    conn_args = {"host": args.host, "port": args.port, "unix_socket": args.unix_socket}
+
+    if args.command == "serve":
+        scheduler = JobScheduler(_parse_pool_limits(args.pool_limit), args.default_pool_limit)
+        serve(scheduler, **conn_args)
+        return
+
+    if args.command == "submit":
+        payload = {"toml_path": os.path.abspath(args.toml_path), "priority": args.priority,
+                   "gpu_pool": args.gpu_pool}
+        status, data = request_scheduler("POST", "/jobs", payload, **conn_args)
+    elif args.command == "list":
+        status, data = request_scheduler("GET", "/jobs", **conn_args)
+    elif args.command == "status":
+        status, data = request_scheduler("GET", f"/jobs/{args.job_id}", **conn_args)
+    else:
+        status, data = request_scheduler("DELETE", f"/jobs/{args.job_id}", **conn_args)
+
+    print(json.dumps(data, indent=2))
+    if status >= 400:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
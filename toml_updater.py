@@ -1,9 +1,9 @@
 
 import subprocess
-import toml
+from config_loader import get_user_input_path, update_config_value
 
 #   # Check the status of pods in the namespace
-def update_cluster_ip_in_toml(namespace, toml_file_path):
+def update_cluster_ip_in_toml(namespace):
     try:
          # Run the kubectl command to get the list of services in the namespace
         result = subprocess.run(
@@ -28,17 +28,11 @@ def update_cluster_ip_in_toml(namespace, toml_file_path):
                 cluster_ip = columns[cluster_ip_index]
                 print(f" Found cluster IP for service '{name}': {cluster_ip}")
 
-                toml_data = toml.load(toml_file_path)
-                if "values" not in toml_data:
-                    toml_data["values"] = {}
-                    #  Update the 'cluster_ip' value
-                toml_data["values"]["cluster_ip"] = cluster_ip
+                #  Update the 'cluster_ip' value
+                update_config_value("values", "cluster_ip", cluster_ip)
 
-                with open(toml_file_path, 'w') as f:
-                    toml.dump(toml_data, f)
-
-                print(f" Updated 'cluster_ip' in '{toml_file_path}'")
-                return
+                print(f" Updated 'cluster_ip' in '{get_user_input_path()}'")
+                return cluster_ip
         print(" No service ending with 'private' and containing '8b-bf16-tp1-pp1' found.")
     except subprocess.CalledProcessError as e:
         print(" Error executing kubectl command:", e.stderr)
@@ -2,36 +2,23 @@ import datetime
 import os
 import subprocess
 import toml
-import yaml
-from config_loader import load_toml_config
+from bench_streamer import BenchStreamer
+from config_loader import load_toml_config, get_user_input_path
+from manifest_renderer import DownloadOverlay, render_manifest, manifest_name, kubectl_manifest
 
 
-# Updates the download YAML file with the specified image and model profile.
-def update_download_yaml(yaml_path, image, selected_model_id):
-    with open(yaml_path, 'r') as f:
-        data = yaml.safe_load(f)
+# Renders the download job manifest in memory with the specified image and model profile.
+def render_download_yaml(yaml_path, image, selected_model_id):
+    manifest = render_manifest(yaml_path, DownloadOverlay(image, selected_model_id))
+    print(f"Rendered download job with image: {image} and profile: {selected_model_id}")
+    return manifest
 
-    # Update the container image and arguments
-    container = data["spec"]["template"]["spec"]["containers"][0]
-    container["image"] = image
-    container["args"] = ["download-to-cache", "--profile", selected_model_id]
 
-    with open(yaml_path, 'w') as f:
-        yaml.safe_dump(data, f)
+#   Creates a Kubernetes job from the rendered download manifest.
 
-    print(f"Updated YAML with image: {image} and profile: {selected_model_id}")
-
-
-#   Creates a Kubernetes job using the specified YAML file.
-
-def create_download_job(yaml_path, NAMESPACE):
-    print(f"Creating download job from: {yaml_path}")
-    result = subprocess.run(
-        ["kubectl", "create", "-f", yaml_path, "-n", NAMESPACE],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        universal_newlines=True
-    )
+def create_download_job(manifest, NAMESPACE):
+    print(f"Creating download job '{manifest_name(manifest)}'")
+    result = kubectl_manifest("create", manifest, NAMESPACE)
      
     # Handle job creation results
     if result.returncode != 0:
@@ -43,13 +30,24 @@ def create_download_job(yaml_path, NAMESPACE):
     else:
         print(result.stdout.strip())
 
-# Executes the download flow by updating the YAML file and creating the job.
+# Deletes the download job and its pods, waiting until they are gone so the next profile gets a fresh job.
+def delete_download_job(manifest, NAMESPACE):
+    print(f"Deleting download job '{manifest_name(manifest)}' if it exists...")
+    subprocess.run(["kubectl", "delete", "job", manifest_name(manifest), "-n", NAMESPACE,
+                    "--ignore-not-found", "--cascade=foreground", "--wait=true"], check=True)
+
+
+# Waits until the download job has completed.
+def wait_for_download_job(manifest, NAMESPACE, timeout=3600):
+    print(f"Waiting for download job '{manifest_name(manifest)}' to complete...")
+    subprocess.run(["kubectl", "wait", "--for=condition=complete", f"job/{manifest_name(manifest)}",
+                    "-n", NAMESPACE, f"--timeout={timeout}s"], check=True)
+
+# Executes the download flow by rendering the job manifest and creating the job.
 def run_download_flow(toml_path, NAMESPACE):
     yaml_path, image, selected_model_id = load_toml_config()
-    update_download_yaml(yaml_path, image, selected_model_id)
-    create_download_job(yaml_path, NAMESPACE)
-
-    job_basename = os.path.splitext(os.path.basename(yaml_path))[0].replace("download_", "")
+    manifest = render_download_yaml(yaml_path, image, selected_model_id)
+    create_download_job(manifest, NAMESPACE)
 
 #  Creates or updates the GenAI performance pod using the specified YAML file.
 def genai_pod_yaml(toml_path, NAMESPACE):
@@ -83,12 +81,13 @@ def genai_pod_yaml(toml_path, NAMESPACE):
     print(f"Getting active pods in namespace '{NAMESPACE}'...")
     subprocess.run(["kubectl", "get", "pods", "-n", NAMESPACE])
 
-def run_bench_script_from_pod(toml_path, pod_name, namespace):
+# Runs bench.sh inside the pod; overrides replaces [final_exec] values (e.g. use_cases, concurrency_values) for this run only.
+def run_bench_script_from_pod(toml_path, pod_name, namespace, stream=False, overrides=None):
     config = toml.load(toml_path)
 
     shell_script = config.get("paths", {}).get("shell_script")
     ip = config.get("values", {}).get("cluster_ip")
-    config1 = config.get("final_exec", {})
+    config1 = dict(config.get("final_exec", {}), **(overrides or {}))
 
     if not shell_script or not ip:
         raise ValueError("Missing 'shell_script' or 'cluster_ip' in TOML file.")
@@ -117,15 +116,23 @@ def run_bench_script_from_pod(toml_path, pod_name, namespace):
         "--use-cases", config1["use_cases"],
         "--artifacts-dir", config1["artifacts_dir"]
     ]
+    if config1.get("input_file"):
+        # Replay a workload payload instead of the use case sweep
+        exec_cmd += ["--input-file", config1["input_file"]]
    
     print(f" Running benchmark script inside pod '{pod_name}'...")
-    subprocess.run(exec_cmd, check=True)
+    if stream or config1.get("stream"):
+        # Follow the sweep point by point and copy each export as soon as its point completes
+        BenchStreamer(namespace, pod_name, config1["model"], config["paths"]["pod_artifacts_path"],
+                      config["paths"]["destination_path"], export_file_name).run(exec_cmd)
+    else:
+        subprocess.run(exec_cmd, check=True)
     print(" Benchmark script executed successfully.")    
+    return export_file_name
   
 
 def copy_artifacts_from_pod_using_toml(namespace: str, pod_name: str):
-    USER_INPUT_PATH = os.path.join(os.getcwd(), "user_input.toml")
-    with open(USER_INPUT_PATH, "r") as f:
+    with open(get_user_input_path(), "r") as f:
         config = toml.load(f)
 
     pod_artifacts_path = config["paths"]["pod_artifacts_path"]
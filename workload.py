@@ -0,0 +1,311 @@
+import argparse
+import csv
+import json
+import math
+import os
+import posixpath
+import random
+import re
+import subprocess
+import time
+from array import array
+from itertools import zip_longest
+
+import ijson
+import numpy as np
+
+from config_loader import get_user_input_path, load_config
+from results_store import write_run_metadata
+from utils import copy_artifacts_from_pod_using_toml, run_bench_script_from_pod
+
+BENCH_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench.sh")
+USE_CASE_LINE = re.compile(r'^\s*\["([^"]+)"\]="(\d+)/(\d+)"')
+WORKLOAD_EXPORT_SUFFIX = "_workload.json"
+CLASS_COLUMNS = ["class", "requests", "ttft_p50", "ttft_p90", "ttft_p99", "latency_p50", "latency_p90", "latency_p99",
+                 "output_tokens_per_s"]
+
+
+# Reads the useCases table of bench.sh into {use case: (input tokens, output tokens)}.
+def load_use_cases(bench_script=BENCH_SCRIPT):
+    use_cases = {}
+    with open(bench_script, "r") as f:
+        in_table = False
+        for line in f:
+            if line.startswith("declare -A useCases"):
+                in_table = True
+            elif in_table and line.strip() == ")":
+                break
+            elif in_table:
+                match = USE_CASE_LINE.match(line)
+                if match:
+                    use_cases[match.group(1)] = (int(match.group(2)), int(match.group(3)))
+    return use_cases
+
+
+# Parses "Search:6,Summarization:3" into normalized weights.
+def parse_mix(value):
+    weights = {}
+    for item in str(value).split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition(":")
+        weights[name.strip()] = float(weight) if weight else 1.0
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError(f"Workload mix '{value}' has no positive weight.")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+# Yields trace records (timestamp ms, input tokens, output tokens, class) one line at a time from a CSV or JSONL file.
+# Timestamps are made relative to the first record and multiplied by time_scale (0.5 replays twice as fast).
+# The trace must be in timestamp order: the class of each request is matched to the export by send order.
+def read_trace(path, time_scale=1.0):
+    start = previous = None
+    with open(path, "r", newline="") as f:
+        if path.endswith((".jsonl", ".json")):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for line_number, row in enumerate(rows, 1):
+            timestamp = float(row["timestamp"])
+            if previous is not None and timestamp < previous:
+                raise ValueError(f"Trace {path} is not in timestamp order at record {line_number} "
+                                 f"({timestamp} after {previous}); sort it by timestamp first.")
+            start = timestamp if start is None else start
+            previous = timestamp
+            yield {
+                "timestamp": int(round((timestamp - start) * time_scale)),
+                "input_tokens": int(row.get("input_tokens") or row["input_length"]),
+                "output_tokens": int(row.get("output_tokens") or row["output_length"]),
+                "class": row.get("class") or None,
+            }
+
+
+# Returns the use case whose input/output lengths are closest (in log space) to a request.
+def nearest_use_case(input_tokens, output_tokens, use_cases):
+    def distance(lengths):
+        return (abs(math.log(max(input_tokens, 1) / lengths[0])) +
+                abs(math.log(max(output_tokens, 1) / lengths[1])))
+    return min(use_cases, key=lambda name: distance(use_cases[name]))
+
+
+# Labels trace records without a class with the nearest configured use case.
+def classify_trace(records, use_cases):
+    for record in records:
+        if not record["class"]:
+            record["class"] = nearest_use_case(record["input_tokens"], record["output_tokens"], use_cases)
+        yield record
+
+
+# Yields num_requests records drawn from the weighted mix, with gamma-distributed gaps averaging 1/request_rate.
+# burstiness 1.0 gives Poisson arrivals, lower values give burstier traffic.
+def generate_mix(mix, use_cases, request_rate, num_requests, burstiness=1.0, seed=1234):
+    unknown = [name for name in mix if name not in use_cases]
+    if unknown:
+        raise ValueError(f"Use case(s) not defined in bench.sh: {', '.join(unknown)}")
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    timestamp = 0.0
+    for _ in range(num_requests):
+        name = rng.choices(names, weights)[0]
+        input_tokens, output_tokens = use_cases[name]
+        yield {"timestamp": int(round(timestamp)), "input_tokens": input_tokens,
+               "output_tokens": output_tokens, "class": name}
+        timestamp += rng.gammavariate(burstiness, 1000.0 / (request_rate * burstiness))
+
+
+# Writes the genai-perf payload file and the class of each request (one per line, same order) as records stream by.
+# Requests tied on the same millisecond could be sent in any order, which would break the class mapping, so every
+# timestamp is made strictly greater than the previous one (ties move 1 ms later).
+def write_payload(records, payload_path, classes_path):
+    count = 0
+    previous = -1
+    with open(payload_path, "w") as payload, open(classes_path, "w") as classes:
+        for record in records:
+            timestamp = max(record["timestamp"], previous + 1)
+            previous = timestamp
+            payload.write(json.dumps({"timestamp": timestamp, "input_length": record["input_tokens"],
+                                      "output_length": record["output_tokens"]}) + "\n")
+            classes.write(record["class"] + "\n")
+            count += 1
+    return count
+
+
+# Returns the records of the configured workload: a replayed [workload] trace_file, or the weighted [workload] mix.
+def workload_records(workload, use_cases):
+    if workload.get("trace_file"):
+        classes = [c.strip() for c in str(workload.get("classes", load_config()["final_exec"]["use_cases"])).split(",")]
+        missing = [c for c in classes if c not in use_cases]
+        if missing:
+            raise ValueError(f"Use case(s) not defined in bench.sh: {', '.join(missing)}")
+        trace = read_trace(workload["trace_file"], float(workload.get("time_scale", 1.0)))
+        return classify_trace(trace, {c: use_cases[c] for c in classes})
+    if workload.get("mix"):
+        return generate_mix(parse_mix(workload["mix"]), use_cases, float(workload.get("request_rate", 1.0)),
+                            int(workload.get("num_requests", 1000)), float(workload.get("burstiness", 1.0)),
+                            int(workload.get("seed", 1234)))
+    raise ValueError("Set either trace_file or mix under [workload].")
+
+
+# Finds the raw genai-perf profile export (with per-request timestamps) of a workload run.
+def find_profile_export(destination_path, run_id):
+    file_name = f"{run_id}{WORKLOAD_EXPORT_SUFFIX}"
+    for root, _, files in os.walk(destination_path):
+        if file_name in files:
+            return os.path.join(root, file_name)
+    return None
+
+
+# Yields (ttft ms, latency ms, output responses) for every request of a genai-perf profile export, in send order.
+# The export is streamed one request at a time; only four numbers per request are kept to restore the send order.
+def iter_request_timings(profile_export):
+    sent, ttft, latency, counts = array("q"), array("d"), array("d"), array("q")
+    with open(profile_export, "rb") as f:
+        for request in ijson.items(f, "experiments.item.requests.item", use_float=True):
+            responses = request.get("response_timestamps") or []
+            sent.append(request["timestamp"])
+            counts.append(len(responses))
+            if responses:
+                ttft.append((responses[0] - request["timestamp"]) / 1e6)
+                latency.append((responses[-1] - request["timestamp"]) / 1e6)
+            else:
+                ttft.append(math.nan)
+                latency.append(math.nan)
+
+    for index in np.argsort(np.asarray(sent), kind="stable"):
+        if not counts[index]:
+            yield None, None, 0
+            continue
+        yield ttft[index], latency[index], counts[index]
+
+
+# Computes TTFT and request latency percentiles per request class. The payload is sent in strictly increasing
+# timestamp order, so the n-th request of the export belongs to the n-th line of the class file. Any request
+# missing from the export would shift every later class, so the two must have the same length.
+def per_class_latency(profile_export, classes_path):
+    ttft, latency, responses = {}, {}, {}
+    exported = classified = 0
+    with open(classes_path, "r") as classes:
+        for request_class, timing in zip_longest((line.strip() for line in classes),
+                                                 iter_request_timings(profile_export)):
+            exported += timing is not None
+            classified += request_class is not None
+            if request_class is None or timing is None:
+                continue
+            first, last, count = timing
+            if first is None:
+                continue
+            ttft.setdefault(request_class, array("d")).append(first)
+            latency.setdefault(request_class, array("d")).append(last)
+            responses[request_class] = responses.get(request_class, 0) + count
+    if exported != classified:
+        raise ValueError(f"{profile_export} holds {exported} request(s) but {classes_path} lists {classified}; "
+                         f"requests cannot be matched to their classes.")
+
+    rows = []
+    for request_class in sorted(ttft):
+        t, l = np.asarray(ttft[request_class]), np.asarray(latency[request_class])
+        rows.append({
+            "class": request_class,
+            "requests": len(t),
+            "ttft_p50": float(np.percentile(t, 50)),
+            "ttft_p90": float(np.percentile(t, 90)),
+            "ttft_p99": float(np.percentile(t, 99)),
+            "latency_p50": float(np.percentile(l, 50)),
+            "latency_p90": float(np.percentile(l, 90)),
+            "latency_p99": float(np.percentile(l, 99)),
+            # Streaming responses carry roughly one token each
+            "output_tokens_per_s": float(responses[request_class] / (l.sum() / 1000.0)) if l.sum() else None,
+        })
+    return rows
+
+
+# Prints the per-class latency table.
+def print_class_report(rows):
+    header = (f"{'Class':<16} {'Requests':>8} {'TTFT p50':>9} {'TTFT p90':>9} {'TTFT p99':>9} "
+              f"{'Lat p50':>9} {'Lat p90':>9} {'Lat p99':>9}")
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['class']:<16} {r['requests']:>8} {r['ttft_p50']:>9.1f} {r['ttft_p90']:>9.1f} {r['ttft_p99']:>9.1f} "
+              f"{r['latency_p50']:>9.1f} {r['latency_p90']:>9.1f} {r['latency_p99']:>9.1f}")
+
+
+# Builds the [workload] payload, replays it from the genai-perf pod and writes the per-class latency report.
+def run_workload(namespace, target_pod):
+    config = load_config()
+    workload = config.get("workload", {})
+    destination_path = config["paths"]["destination_path"]
+    workload_dir = os.path.join(destination_path, "workload")
+    os.makedirs(workload_dir, exist_ok=True)
+
+    name = f"{config['final_exec']['export_file_name']}-workload-{time.strftime('%Y%m%d_%H%M%S')}"
+    payload_path = os.path.join(workload_dir, f"{name}.payload.jsonl")
+    classes_path = os.path.join(workload_dir, f"{name}.classes")
+    count = write_payload(workload_records(workload, load_use_cases(workload.get("bench_script", BENCH_SCRIPT))),
+                          payload_path, classes_path)
+    print(f" Wrote {count} request(s) to {payload_path}")
+
+    pod_payload_path = posixpath.join(posixpath.dirname(config["paths"]["shell_script"]), os.path.basename(payload_path))
+    print(f" Copying payload to pod '{target_pod}' → {pod_payload_path}")
+    subprocess.run(["kubectl", "cp", payload_path, f"{namespace}/{target_pod}:{pod_payload_path}"], check=True)
+
+    run_id = run_bench_script_from_pod(get_user_input_path(), target_pod, namespace,
+                                       overrides={"input_file": pod_payload_path, "export_file_name": name,
+                                                  "stream": False})
+    copy_artifacts_from_pod_using_toml(namespace, target_pod)
+    write_run_metadata(destination_path, run_id, config)
+
+    profile_export = find_profile_export(destination_path, run_id)
+    if profile_export is None:
+        raise FileNotFoundError(f"No profile export '{run_id}{WORKLOAD_EXPORT_SUFFIX}' under {destination_path}.")
+    rows = per_class_latency(profile_export, classes_path)
+    print_class_report(rows)
+
+    report_path = os.path.join(destination_path, f"{run_id}-workload-classes.csv")
+    with open(report_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CLASS_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f" Per-class latency report written to {report_path}")
+    return report_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build genai-perf workload payloads and report latency per request class.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Write the payload and class files without running anything.")
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument("--trace", help="Trace CSV or JSONL with timestamp (ms), input_tokens, output_tokens[, class].")
+    source.add_argument("--mix", help="Weighted use cases, e.g. 'Search:6,Summarization:3,LargeCL-20000:1'.")
+    build.add_argument("--time-scale", type=float, default=1.0, help="Multiplier applied to trace timestamps.")
+    build.add_argument("--classes", default="Search,Summarization,Translation",
+                       help="Use cases trace requests without a class are matched against.")
+    build.add_argument("--request-rate", type=float, default=1.0)
+    build.add_argument("--num-requests", type=int, default=1000)
+    build.add_argument("--burstiness", type=float, default=1.0)
+    build.add_argument("--seed", type=int, default=1234)
+    build.add_argument("--output", required=True, help="Payload path; the class file is written next to it.")
+
+    report = sub.add_parser("report", help="Report per-class latency from a copied profile export.")
+    report.add_argument("profile_export")
+    report.add_argument("classes_file")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        use_cases = load_use_cases()
+        if args.trace:
+            classes = {c: use_cases[c] for c in args.classes.split(",")}
+            records = classify_trace(read_trace(args.trace, args.time_scale), classes)
+        else:
+            records = generate_mix(parse_mix(args.mix), use_cases, args.request_rate, args.num_requests,
+                                   args.burstiness, args.seed)
+        classes_path = f"{os.path.splitext(args.output)[0]}.classes"
+        print(f" Wrote {write_payload(records, args.output, classes_path)} request(s) to {args.output} ({classes_path})")
+    else:
+        print_class_report(per_class_latency(args.profile_export, args.classes_file))
+
+
+if __name__ == "__main__":
+    main()